@@ -1,6 +1,12 @@
+import argparse
 import os
 import pandas as pd
 
+import partition_store
+from array_store import append_arrays, arrays_are_fresh, write_arrays
+from data_store import append_cache, cache_is_fresh, read_table, write_cache
+from entity_registry import REGISTRY_NAME, EntityRegistry
+
 
 TEAM_NAME_MAP = {
 	# Add or edit mappings as needed
@@ -16,42 +22,26 @@ PLAYER_NAME_MAP = {
 }
 
 
-def _standardize_series(s: pd.Series, mapping: dict) -> pd.Series:
-	if mapping:
-		return s.replace(mapping)
-	return s
+def _load_registry(out_dir: str) -> EntityRegistry:
+	"""Saved team/player registry for `out_dir`, seeded with the mapping dicts above."""
+	registry = EntityRegistry.load(os.path.join(out_dir, REGISTRY_NAME))
+	registry.add_aliases("team", TEAM_NAME_MAP)
+	registry.add_aliases("player", PLAYER_NAME_MAP)
+	return registry
 
 
-def preprocess_data(deliveries_path: str, matches_path: str, out_dir: str = None):
-	"""Load, clean and save deliveries and matches data.
+MANIFEST_NAME = "ingested_matches.txt"
 
-	Cleaning performed:
-	- Standardise team and player names via mapping dicts (edit mappings above).
-	- Handle missing values for `winner`, `player_of_match`, and `result_margin`.
-	- Remove `umpire1` and `umpire2` if present.
-	- Save cleaned CSVs next to originals unless `out_dir` is provided.
-
-	Returns: (deliveries_df, matches_df)
-	"""
-	deliveries = pd.read_csv(deliveries_path)
-	matches = pd.read_csv(matches_path)
-
-	# Standardise team names in both datasets
-	team_cols_deliveries = [c for c in ["batting_team", "bowling_team"] if c in deliveries.columns]
-	for c in team_cols_deliveries:
-		deliveries[c] = _standardize_series(deliveries[c], TEAM_NAME_MAP)
 
+def _clean_matches(matches: pd.DataFrame, registry: EntityRegistry):
+	"""Standardise names and drop incomplete matches. Returns: (matches_df, removed_match_ids)"""
+	# Standardise team names
 	team_cols_matches = [c for c in ["team1", "team2", "toss_winner", "winner"] if c in matches.columns]
 	for c in team_cols_matches:
-		matches[c] = _standardize_series(matches[c], TEAM_NAME_MAP)
-
-	# Standardise player names where relevant
-	player_cols_deliveries = [c for c in ["batter", "bowler", "non_striker", "player_dismissed"] if c in deliveries.columns]
-	for c in player_cols_deliveries:
-		deliveries[c] = _standardize_series(deliveries[c], PLAYER_NAME_MAP)
+		matches[c] = registry.standardize(matches[c], "team")
 
 	if "player_of_match" in matches.columns:
-		matches["player_of_match"] = _standardize_series(matches["player_of_match"], PLAYER_NAME_MAP)
+		matches["player_of_match"] = registry.standardize(matches["player_of_match"], "player")
 
 	# Handle missing values in matches: remove rows with missing winner, player_of_match, or result_margin
 	# Identify match IDs to remove
@@ -66,16 +56,114 @@ def preprocess_data(deliveries_path: str, matches_path: str, out_dir: str = None
 	
 	# Remove matches with missing values
 	matches = matches[~matches["id"].isin(matches_to_remove)].reset_index(drop=True)
-	
-	# Remove corresponding rows from deliveries
-	if "match_id" in deliveries.columns:
-		deliveries = deliveries[~deliveries["match_id"].isin(matches_to_remove)].reset_index(drop=True)
 
 	# Remove unnecessary columns if present
 	for col in ["umpire1", "umpire2"]:
 		if col in matches.columns:
 			matches = matches.drop(columns=[col])
 
+	return matches, matches_to_remove
+
+
+def _clean_deliveries(deliveries: pd.DataFrame, matches_to_remove: set, registry: EntityRegistry) -> pd.DataFrame:
+	"""Standardise names and drop deliveries of removed matches. Works on a whole file or one chunk."""
+	# Standardise team names
+	team_cols_deliveries = [c for c in ["batting_team", "bowling_team"] if c in deliveries.columns]
+	for c in team_cols_deliveries:
+		deliveries[c] = registry.standardize(deliveries[c], "team")
+
+	# Standardise player names where relevant
+	player_cols_deliveries = [c for c in ["batter", "bowler", "non_striker", "player_dismissed"] if c in deliveries.columns]
+	for c in player_cols_deliveries:
+		deliveries[c] = registry.standardize(deliveries[c], "player")
+
+	# Remove rows belonging to removed matches
+	if "match_id" in deliveries.columns:
+		deliveries = deliveries[~deliveries["match_id"].isin(matches_to_remove)].reset_index(drop=True)
+
+	return deliveries
+
+
+def _read_manifest(path: str) -> set:
+	if not os.path.exists(path):
+		return set()
+	with open(path) as f:
+		return {int(line) for line in f if line.strip()}
+
+
+def _write_manifest(path: str, match_ids, append: bool = False):
+	with open(path, "a" if append else "w") as f:
+		f.writelines(f"{int(i)}\n" for i in sorted(match_ids))
+
+
+def _append_csv(df: pd.DataFrame, path: str):
+	"""Append rows to an existing cleaned CSV, keeping its column order."""
+	columns = pd.read_csv(path, nrows=0).columns
+	df.reindex(columns=columns).to_csv(path, mode="a", header=False, index=False)
+
+
+def _stream_deliveries(deliveries_path: str, deliveries_out: str, matches_to_remove: set, registry: EntityRegistry,
+		keep_ids: set = None, append: bool = False, chunksize: int = 100_000, on_chunk=None) -> int:
+	"""Clean deliveries chunk by chunk, writing each chunk out before reading the next.
+
+	`on_chunk`, if given, is called with every cleaned chunk after it is written.
+
+	Returns: number of delivery rows written.
+	"""
+	columns = pd.read_csv(deliveries_out, nrows=0).columns if append else None
+	written = 0
+	for chunk in pd.read_csv(deliveries_path, chunksize=chunksize):
+		if keep_ids is not None:
+			chunk = chunk[chunk["match_id"].isin(keep_ids)]
+		chunk = _clean_deliveries(chunk, matches_to_remove, registry)
+		if columns is not None:
+			chunk = chunk.reindex(columns=columns)
+		first = written == 0 and not append
+		chunk.to_csv(deliveries_out, mode="w" if first else "a", header=first, index=False)
+		if on_chunk is not None:
+			on_chunk(chunk)
+		written += len(chunk)
+	return written
+
+
+def preprocess_data(deliveries_path: str, matches_path: str, out_dir: str = None, append: bool = False,
+		chunksize: int = None, partition: bool = False, partition_by_venue: bool = False):
+	"""Load, clean and save deliveries and matches data.
+
+	Cleaning performed:
+	- Standardise team and player names through the entity registry
+	  (`entity_registry.csv`), seeded with the mapping dicts above.
+	- Handle missing values for `winner`, `player_of_match`, and `result_margin`.
+	- Remove `umpire1` and `umpire2` if present.
+	- Save cleaned CSVs next to originals unless `out_dir` is provided.
+	- Save a columnar (Parquet) cache of each cleaned CSV for fast reloads.
+	- Save the deliveries as memory-mappable arrays (see array_store.py).
+	- Record the id of every match kept by cleaning in a manifest
+	  (`ingested_matches.txt`); removed matches stay out of it, so corrected
+	  rows for them are picked up by a later append.
+	- Give every new team and player a stable integer ID in the registry.
+
+	With `append=True`, only matches missing from the manifest (and their
+	deliveries) are cleaned and appended to the existing cleaned files. If no
+	cleaned files exist yet, a full run is done instead.
+
+	With `chunksize`, deliveries are streamed: read `chunksize` rows at a
+	time, cleaned and written straight out, so peak memory does not grow
+	with the file. The deliveries Parquet cache and array store are not
+	written in this mode (loaders fall back to the cleaned CSV) and no
+	deliveries frame is returned.
+
+	With `partition=True`, the cleaned rows are also written to a
+	season-partitioned store (`cleaned_store/`, see partition_store.py),
+	split by venue within each season when `partition_by_venue` is set.
+	Appends add new part files to an existing store; if there is no store
+	yet, or it no longer matches the cleaned files, it is built from the full
+	cleaned files. Runs without `partition` leave any store stale, and
+	`load_cleaned` then reads the cleaned files instead.
+
+	Returns: (deliveries_df, matches_df) - only the newly ingested rows in append
+	mode; deliveries_df is None when streaming.
+	"""
 	# Prepare output paths
 	base_deliveries = os.path.splitext(os.path.basename(deliveries_path))[0]
 	base_matches = os.path.splitext(os.path.basename(matches_path))[0]
@@ -83,19 +171,98 @@ def preprocess_data(deliveries_path: str, matches_path: str, out_dir: str = None
 
 	deliveries_out = os.path.join(out_dir, f"{base_deliveries}_cleaned.csv")
 	matches_out = os.path.join(out_dir, f"{base_matches}_cleaned.csv")
+	manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+
+	append = append and os.path.exists(deliveries_out) and os.path.exists(matches_out)
+
+	matches = pd.read_csv(matches_path)
+	keep_ids = None
+	if append:
+		cleaned_ids = set(pd.read_csv(matches_out, usecols=["id"])["id"])
+		# Manifests written by older runs may list removed matches; only ids in the cleaned file count
+		ingested = _read_manifest(manifest_path) & cleaned_ids if os.path.exists(manifest_path) else cleaned_ids
+		matches = matches[~matches["id"].isin(ingested)].reset_index(drop=True)
+		keep_ids = set(matches["id"])
+
+	registry = _load_registry(out_dir)
+	matches, matches_to_remove = _clean_matches(matches, registry)
 
-	deliveries.to_csv(deliveries_out, index=False)
-	matches.to_csv(matches_out, index=False)
+	# Check freshness before an append bumps the CSV modification times
+	deliveries_cached = append and cache_is_fresh(deliveries_out)
+	deliveries_mapped = append and arrays_are_fresh(deliveries_out)
+	matches_cached = append and cache_is_fresh(matches_out)
+
+	# A store left stale by an earlier run without --partition is rebuilt rather than appended to
+	store_root = os.path.join(out_dir, partition_store.STORE_NAME)
+	rebuild_store = partition and append and not partition_store.is_fresh(store_root, [matches_out, deliveries_out])
+	add_to_store = partition and not rebuild_store
+	if add_to_store:
+		if not append:
+			partition_store.reset_store(store_root, by_venue=partition_by_venue)
+		partition_store.add_matches(store_root, matches)
+
+	if chunksize:
+		deliveries = None
+		on_chunk = (lambda chunk: partition_store.add_deliveries(store_root, chunk, matches)) if add_to_store else None
+		_stream_deliveries(deliveries_path, deliveries_out, matches_to_remove, registry,
+			keep_ids=keep_ids, append=append, chunksize=chunksize, on_chunk=on_chunk)
+	else:
+		deliveries = pd.read_csv(deliveries_path)
+		if keep_ids is not None:
+			deliveries = deliveries[deliveries["match_id"].isin(keep_ids)].reset_index(drop=True)
+		deliveries = _clean_deliveries(deliveries, matches_to_remove, registry)
+		if append:
+			_append_csv(deliveries, deliveries_out)
+			if deliveries_cached:
+				append_cache(deliveries, deliveries_out)
+			if deliveries_mapped:
+				append_arrays(deliveries, deliveries_out)
+		else:
+			deliveries.to_csv(deliveries_out, index=False)
+			write_cache(deliveries, deliveries_out)
+			write_arrays(deliveries, deliveries_out)
+		if add_to_store:
+			partition_store.add_deliveries(store_root, deliveries, matches)
+
+	if append:
+		_append_csv(matches, matches_out)
+		if matches_cached:
+			append_cache(matches, matches_out)
+	else:
+		matches.to_csv(matches_out, index=False)
+		write_cache(matches, matches_out)
+
+	if rebuild_store:
+		all_matches = read_table(matches_out, categorical=False)
+		partition_store.reset_store(store_root, by_venue=partition_by_venue)
+		partition_store.add_matches(store_root, all_matches)
+		partition_store.add_deliveries(store_root, read_table(deliveries_out, categorical=False), all_matches)
+
+	if partition:
+		partition_store.record_sources(store_root, [matches_out, deliveries_out])
+	_write_manifest(manifest_path, matches["id"], append=append)
+	registry.save(os.path.join(out_dir, REGISTRY_NAME))
 
 	return deliveries, matches
 
 
 if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Clean deliveries.csv and matches.csv into the _cleaned files")
+	parser.add_argument("--append", action="store_true", help="clean and append only matches missing from the manifest")
+	parser.add_argument("--stream", action="store_true", help="read deliveries in chunks of 100,000 rows")
+	parser.add_argument("--partition", action="store_true", help="also write the per-season cleaned_store/")
+	parser.add_argument("--partition-by-venue", action="store_true",
+		help="like --partition, with a venue level inside each season")
+	args = parser.parse_args()
+
 	# Default runner: assumes files are in the same folder as this script
 	folder = os.path.dirname(__file__)
 	deliveries_path = os.path.join(folder, "deliveries.csv")
 	matches_path = os.path.join(folder, "matches.csv")
-	d, m = preprocess_data(deliveries_path, matches_path)
-	print("Saved cleaned files.")
-
-
+	d, m = preprocess_data(deliveries_path, matches_path, append=args.append,
+		chunksize=100_000 if args.stream else None, partition=args.partition or args.partition_by_venue,
+		partition_by_venue=args.partition_by_venue)
+	if args.append:
+		print(f"Appended {len(m)} new matches.")
+	else:
+		print("Saved cleaned files.")
@@ -0,0 +1,205 @@
+"""Incrementally maintained aggregate tables for the CSV reports.
+
+The batter, bowler, team, venue and season reports are stored as mergeable
+partial aggregates (sums and counts) keyed by entity and match, plus a
+running totals table per report. Adding matches appends their partials,
+adds them into the totals and recomputes the derived rates (strike rate,
+economy, dot-ball %) only for the rows that changed.
+
+Layout of the store directory (`aggregates/` by default):
+- `<table>_partials.csv`: one row per (entity, match_id)
+- `<table>_totals.csv`: one row per entity, sums plus derived rates
+- `matches.txt`: match ids already folded into the totals
+- `<table>_form*.csv`: recent-form state of the batters and bowlers (see `player_form`)
+- `partnerships.csv`: one row per batting partnership of the matches in the store
+"""
+import os
+import pandas as pd
+
+import player_form
+from partnerships import DTYPES as PARTNERSHIP_DTYPES, partnerships
+from data_store import read_table
+
+
+STORE_DIR = "aggregates"
+PARTNERSHIPS_NAME = "partnerships.csv"
+
+# table name -> (entity column, summed columns)
+TABLES = {
+    "batsmen": ("batter", ["runs", "balls_faced", "fours", "sixes"]),
+    "bowlers": ("bowler", ["wickets", "balls_bowled", "runs_conceded", "dot_balls"]),
+    "team_wins": ("winner", ["Total_Wins"]),
+    "venues": ("venue", ["total_matches", "decided_matches"]),
+    "seasons": ("season", ["total_matches", "decided_matches"]),
+}
+
+
+def delivery_partials(deliveries: pd.DataFrame) -> dict:
+    """Per-(player, match) sums for the batter and bowler tables."""
+    runs = deliveries["batsman_runs"]
+    flags = pd.DataFrame({
+        "match_id": deliveries["match_id"],
+        "batter": deliveries["batter"],
+        "bowler": deliveries["bowler"],
+        "runs": runs,
+        "ball": 1,
+        "four": (runs == 4).astype(int),
+        "six": (runs == 6).astype(int),
+        "wicket": (deliveries["is_wicket"] == 1).astype(int),
+        "total": deliveries["total_runs"],
+        "dot": (deliveries["total_runs"] == 0).astype(int),
+    })
+    batsmen = flags.groupby(["batter", "match_id"], observed=True)[["runs", "ball", "four", "six"]].sum()
+    batsmen.columns = TABLES["batsmen"][1]
+    bowlers = flags.groupby(["bowler", "match_id"], observed=True)[["wicket", "ball", "total", "dot"]].sum()
+    bowlers.columns = TABLES["bowlers"][1]
+    return {"batsmen": batsmen, "bowlers": bowlers}
+
+
+def match_partials(matches: pd.DataFrame) -> dict:
+    """Per-(team/venue/season, match) counts for the match-level tables."""
+    decided = matches[matches["winner"].notna()]
+    team_wins = pd.DataFrame({"Total_Wins": 1}, index=pd.MultiIndex.from_arrays(
+        [decided["winner"], decided["id"]], names=["winner", "match_id"]))
+    venues = pd.DataFrame({"total_matches": 1, "decided_matches": 1}, index=pd.MultiIndex.from_arrays(
+        [decided["venue"], decided["id"]], names=["venue", "match_id"]))
+    seasons = pd.DataFrame({
+        "total_matches": 1,
+        "decided_matches": matches["winner"].notna().astype(int).to_numpy(),
+    }, index=pd.MultiIndex.from_arrays([matches["season"], matches["id"]], names=["season", "match_id"]))
+    return {"team_wins": team_wins, "venues": venues, "seasons": seasons}
+
+
+def derive_rates(name: str, totals: pd.DataFrame) -> pd.DataFrame:
+    """Add the derived rate columns for a totals table (or a slice of one)."""
+    totals = totals.copy()
+    if name == "batsmen":
+        totals["strike_rate"] = (totals["runs"] / totals["balls_faced"] * 100).round(2)
+    elif name == "bowlers":
+        totals["overs"] = (totals["balls_bowled"] / 6).round(2)
+        totals["economy_rate"] = (totals["runs_conceded"] / (totals["balls_bowled"] / 6)).round(2)
+        totals["dot_ball_percentage"] = ((totals["dot_balls"] / totals["balls_bowled"]) * 100).round(2)
+    return totals
+
+
+def _path(store_dir: str, name: str, kind: str) -> str:
+    return os.path.join(store_dir, f"{name}_{kind}.csv")
+
+
+def _read_match_ids(store_dir: str) -> set:
+    path = os.path.join(store_dir, "matches.txt")
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {int(line) for line in f if line.strip()}
+
+
+def load_totals(store_dir: str = STORE_DIR) -> dict:
+    """Read every totals table in the store. Missing tables come back empty."""
+    totals = {}
+    for name, (entity, columns) in TABLES.items():
+        path = _path(store_dir, name, "totals")
+        if os.path.exists(path):
+            totals[name] = pd.read_csv(path, index_col=entity, dtype={entity: str})
+        else:
+            totals[name] = derive_rates(name, pd.DataFrame(columns=columns, index=pd.Index([], name=entity), dtype="int64"))
+    totals.update(player_form.load_form(store_dir))
+    path = os.path.join(store_dir, PARTNERSHIPS_NAME)
+    if os.path.exists(path):
+        totals["partnerships"] = pd.read_csv(path, dtype=PARTNERSHIP_DTYPES)
+    else:
+        totals["partnerships"] = partnerships(pd.DataFrame())
+    return totals
+
+
+def update(deliveries: pd.DataFrame, matches: pd.DataFrame, store_dir: str = STORE_DIR) -> dict:
+    """Fold new matches into the store and return the updated totals.
+
+    Matches already recorded in the store are ignored, so re-running an
+    update with overlapping data does not double count.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    done = _read_match_ids(store_dir)
+    all_matches = matches
+    matches = matches[~matches["id"].isin(done)]
+    deliveries = deliveries[deliveries["match_id"].isin(matches["id"])]
+    totals = load_totals(store_dir)
+    if matches.empty:
+        return totals
+
+    partials = {**delivery_partials(deliveries), **match_partials(matches)}
+    for name, (entity, columns) in TABLES.items():
+        part = partials[name]
+        part_path = _path(store_dir, name, "partials")
+        part.to_csv(part_path, mode="a", header=not os.path.exists(part_path))
+
+        delta = part.groupby(level=entity, observed=True).sum()
+        table = totals[name]
+        table = table.reindex(table.index.union(delta.index))
+        changed = delta.index
+        table[columns] = table[columns].fillna(0).astype("int64")
+        table.loc[changed, columns] += delta[columns]
+        # Derived rates are recomputed only for the entities touched by this update
+        derived = derive_rates(name, table.loc[changed, columns])
+        for c in derived.columns.difference(columns):
+            table.loc[changed, c] = derived[c]
+        table.to_csv(_path(store_dir, name, "totals"))
+        totals[name] = table
+
+    if done and not player_form.has_state(store_dir):
+        # A store written before form tracking: seed the form from every partial on disk,
+        # which needs `matches` to cover the matches already in the store
+        form_partials = {name: pd.read_csv(_path(store_dir, name, "partials"), index_col=[TABLES[name][0], "match_id"])
+                         for name in player_form.FORM_TABLES}
+        totals.update(player_form.update_store(form_partials, all_matches, store_dir, reset=True))
+    else:
+        totals.update(player_form.update_store(partials, matches, store_dir))
+
+    # Partnerships never span matches, so the new matches' rows are simply appended
+    new_partnerships = partnerships(deliveries)
+    path = os.path.join(store_dir, PARTNERSHIPS_NAME)
+    new_partnerships.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+    totals["partnerships"] = pd.concat([totals["partnerships"], new_partnerships], ignore_index=True)
+
+    with open(os.path.join(store_dir, "matches.txt"), "a") as f:
+        f.writelines(f"{int(i)}\n" for i in sorted(matches["id"]))
+    return totals
+
+
+def sync(folder: str = None, store_dir: str = None) -> dict:
+    """Bring the store in `folder` up to date with the cleaned data.
+
+    Only deliveries of matches not yet in the store are loaded.
+    """
+    folder = folder or os.getcwd()
+    store_dir = store_dir or os.path.join(folder, STORE_DIR)
+    matches = read_table(os.path.join(folder, "matches_cleaned.csv"), categorical=False)
+    done = _read_match_ids(store_dir)
+    new_ids = set(matches["id"]) - done
+    if done and not os.path.exists(os.path.join(store_dir, PARTNERSHIPS_NAME)):
+        # A store written before partnerships were kept: backfill them for the matches it has
+        old = read_table(os.path.join(folder, "deliveries_cleaned.csv"), match_ids=done)
+        partnerships(old).to_csv(os.path.join(store_dir, PARTNERSHIPS_NAME), index=False)
+    if not new_ids:
+        return load_totals(store_dir)
+    deliveries = read_table(os.path.join(folder, "deliveries_cleaned.csv"), match_ids=new_ids)
+    return update(deliveries, matches, store_dir)
+
+
+def report_tables(totals: dict) -> dict:
+    """Shape the totals like the `stats_engine.compute_aggregates` report tables."""
+    batsmen = totals["batsmen"].sort_index()
+    bowlers = totals["bowlers"].sort_index()
+    bowlers = bowlers[bowlers["wickets"] > 0]
+    team_wins = totals["team_wins"].sort_index()["Total_Wins"]
+    return {
+        "batsmen": batsmen[["runs", "balls_faced", "fours", "sixes", "strike_rate"]],
+        "bowlers": bowlers[["wickets", "balls_bowled", "runs_conceded", "overs",
+                            "economy_rate", "dot_balls", "dot_ball_percentage"]],
+        "team_wins": team_wins.sort_values(ascending=False).rename_axis(None).rename(None),
+        "venues": totals["venues"].sort_index().sort_values("total_matches", ascending=False),
+        "seasons": totals["seasons"].sort_index(),
+        "batsmen_form": totals["batsmen_form"],
+        "bowlers_form": totals["bowlers_form"],
+        "partnerships": totals["partnerships"],
+    }
@@ -0,0 +1,115 @@
+"""Memory-mapped, array-backed copy of the cleaned deliveries table.
+
+Each column is saved as a fixed-width NumPy array in a directory next to
+the CSV (`deliveries_cleaned.arrays/`): per-ball numbers as small integers,
+and team, player and other text columns as integer codes into dictionaries
+kept in `_schema.json`. Team and player columns share one dictionary per
+group, as in the Parquet cache.
+
+`read_arrays` opens the arrays with `mmap_mode="r"` and wraps them in a
+DataFrame without copying, so loading is just mapping the files. Every
+process that loads the same store (EDA.py, generate_reports.py, render
+workers) shares the one copy of those pages in the OS page cache instead
+of holding its own parsed frame.
+"""
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+from data_store import compact_dtypes, decode_categories
+
+
+SCHEMA_NAME = "_schema.json"
+
+
+def arrays_path(csv_path: str) -> str:
+    """Directory of the array store that sits next to `csv_path`."""
+    return os.path.splitext(csv_path)[0] + ".arrays"
+
+
+def _dictionary_key(df: pd.DataFrame, column: str, seen: dict) -> str:
+    """Name the dictionary of a categorical column, reusing one shared with an earlier column."""
+    categories = df[column].cat.categories
+    for key, other in seen.items():
+        if categories.equals(df[other].cat.categories):
+            return key
+    seen[column] = column
+    return column
+
+
+def write_arrays(df: pd.DataFrame, csv_path: str) -> str:
+    """Write the array store for a cleaned table.
+
+    Returns the store directory.
+    """
+    path = arrays_path(csv_path)
+    tmp = path + ".tmp"
+    if os.path.isdir(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+
+    df = compact_dtypes(df)
+    for c in df.columns:
+        if df[c].dtype == object or pd.api.types.is_string_dtype(df[c].dtype):
+            df[c] = df[c].astype("category")
+
+    columns, dictionaries, seen = [], {}, {}
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            key = _dictionary_key(df, c, seen)
+            dictionaries.setdefault(key, [str(v) for v in df[c].cat.categories])
+            np.save(os.path.join(tmp, f"{c}.npy"), df[c].cat.codes.to_numpy())
+            columns.append({"name": c, "dictionary": key})
+        else:
+            np.save(os.path.join(tmp, f"{c}.npy"), df[c].to_numpy())
+            columns.append({"name": c})
+    with open(os.path.join(tmp, SCHEMA_NAME), "w") as f:
+        json.dump({"rows": len(df), "columns": columns, "dictionaries": dictionaries}, f)
+
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.replace(tmp, path)
+    return path
+
+
+def arrays_are_fresh(csv_path: str) -> bool:
+    """True when the array store exists and is at least as new as the CSV."""
+    schema = os.path.join(arrays_path(csv_path), SCHEMA_NAME)
+    if not os.path.exists(schema):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(schema) >= os.path.getmtime(csv_path)
+
+
+def read_arrays(csv_path: str, mmap: bool = True) -> pd.DataFrame:
+    """Load the array store as a DataFrame backed by the (memory-mapped) arrays.
+
+    Name columns come back as categoricals over the stored dictionaries.
+    The frame is read-only at the array level; pandas copies a column on
+    the first write to it.
+    """
+    path = arrays_path(csv_path)
+    with open(os.path.join(path, SCHEMA_NAME)) as f:
+        schema = json.load(f)
+    dtypes = {key: pd.CategoricalDtype(values) for key, values in schema["dictionaries"].items()}
+    data = {}
+    for column in schema["columns"]:
+        values = np.load(os.path.join(path, f"{column['name']}.npy"), mmap_mode="r" if mmap else None)
+        if "dictionary" in column:
+            values = pd.Categorical.from_codes(values, dtype=dtypes[column["dictionary"]], validate=False)
+        data[column["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def append_arrays(df: pd.DataFrame, csv_path: str):
+    """Rewrite the array store with newly cleaned rows added.
+
+    Returns the store directory, or None when there is no store to extend.
+    """
+    if not os.path.exists(os.path.join(arrays_path(csv_path), SCHEMA_NAME)):
+        return None
+    existing = decode_categories(read_arrays(csv_path, mmap=False))
+    return write_arrays(pd.concat([existing, df], ignore_index=True), csv_path)
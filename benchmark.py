@@ -0,0 +1,200 @@
+"""Benchmarks for the IPL pipeline stages.
+
+Times and measures the peak memory of preprocessing, loading, the
+batter/bowler aggregations, the rivalry builder, the toss/venue/season
+analyses and each figure render, on the real data and on synthetic data
+(from `synthetic_data.py`) with 10x and 100x as many matches:
+
+    python benchmark.py --scales 1 10 100 --output benchmark_results.json
+    python benchmark.py --compare benchmark_results.json --output new.json
+
+Each stage is run `--repeat` times for timing, then once more under
+`tracemalloc` for its peak allocation. Results are written as JSON, one
+record per (scale, stage), so runs can be diffed or compared with
+`--compare`.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import stats_engine
+import synthetic_data
+from instrumentation import peak_rss_mb
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _preprocess_module():
+    # The preprocessing script's file name is not an importable module name
+    spec = importlib.util.spec_from_file_location("preprocessing", os.path.join(HERE, "Data pre processsing.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def scale_inputs(matches_path: str, factor: int, out_dir: str, seed: int = 0):
+    """Generate synthetic inputs with about `factor` times as many matches as `matches_path`.
+
+    The synthetic league keeps the real number of seasons and grows the
+    league fixtures per season; `synthetic_data.generate` writes the rows a
+    batch of matches at a time, so the scaled files never have to fit in
+    memory.
+
+    Returns: (deliveries_path, matches_path) of the generated files.
+    """
+    matches = pd.read_csv(matches_path, usecols=["season"])
+    seasons = matches["season"].nunique()
+    # Every season also plays four playoff matches on top of its league fixtures
+    per_season = max(1, round(factor * len(matches) / seasons) - 4)
+    synthetic_data.generate(out_dir, seasons=seasons, matches_per_season=per_season, seed=seed)
+    return os.path.join(out_dir, "deliveries.csv"), os.path.join(out_dir, "matches.csv")
+
+
+def measure(fn, repeat: int = 1, memory: bool = True) -> dict:
+    """Time `fn` over `repeat` runs, then measure its peak traced allocation in one more run."""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+    result = {"seconds": seconds, "best_seconds": min(seconds), "mean_seconds": sum(seconds) / len(seconds)}
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_scale(deliveries_path: str, matches_path: str, work_dir: str, repeat: int, memory: bool,
+              renders: bool = True) -> list:
+    """Benchmark every stage on one pair of input files. Returns one record per stage."""
+    preprocessing = _preprocess_module()
+    os.makedirs(work_dir, exist_ok=True)
+    records = []
+
+    def stage(name, fn, rows):
+        result = measure(fn, repeat, memory)
+        records.append({"stage": name, "rows": int(rows), **result})
+        print(f"  {name:<24} {result['best_seconds']:9.3f}s"
+              + (f" {result['peak_mb']:10.1f} MB" if memory else ""))
+
+    with open(deliveries_path) as f:
+        input_rows = sum(1 for _ in f) - 1
+    stage("preprocess", lambda: preprocessing.preprocess_data(deliveries_path, matches_path, out_dir=work_dir),
+          input_rows)
+    stage("load", lambda: stats_engine.load_cleaned(work_dir), input_rows)
+
+    matches, deliveries = stats_engine.load_cleaned(work_dir)
+    n_balls, n_matches = len(deliveries), len(matches)
+    stage("delivery_aggregates", lambda: stats_engine.delivery_aggregates(deliveries, matches), n_balls)
+    stage("rivalries", lambda: stats_engine.head_to_head(matches), n_matches)
+    stage("team_wins", lambda: stats_engine.team_wins(matches), n_matches)
+    stage("toss_decisions", lambda: stats_engine.toss_decision_stats(matches), n_matches)
+    stage("venues", lambda: stats_engine.venue_stats(matches), n_matches)
+    stage("seasons", lambda: stats_engine.season_stats(matches), n_matches)
+
+    if renders:
+        import charts  # deferred so --no-render runs never load matplotlib
+
+        aggregates = stats_engine.compute_aggregates(deliveries, matches)
+        jobs = {
+            "render_batsmen": (charts.render_batsmen, {
+                "batsmen_stats_filtered": stats_engine.qualified_batsmen(aggregates["batsmen"])}),
+            "render_bowlers": (charts.render_bowlers, {
+                "bowlers_stats_filtered": stats_engine.qualified_bowlers(aggregates["bowlers"])}),
+            "render_rivalries": (charts.render_rivalries, {
+                "h2h_df": aggregates["rivalries"], "team_wins": aggregates["team_wins"]}),
+            "render_winning_factors": (charts.render_winning_factors, stats_engine.winning_factor_inputs(matches)),
+        }
+        for name, (render, kwargs) in jobs.items():
+            path = os.path.join(work_dir, f"{name}.png")
+            stage(name, lambda render=render, kwargs=kwargs, path=path: render(**kwargs, path=path), n_matches)
+    return records
+
+
+def compare(current: list, baseline: list, threshold: float = 1.2):
+    """Print the best time of each stage against a previous run, flagging slowdowns over `threshold`."""
+    before = {(r["scale"], r["stage"]): r for r in baseline}
+    print(f"\n{'scale':>5} {'stage':<24} {'before':>9} {'after':>9} {'ratio':>7}")
+    regressions = 0
+    for record in current:
+        old = before.get((record["scale"], record["stage"]))
+        if old is None:
+            continue
+        ratio = record["best_seconds"] / old["best_seconds"] if old["best_seconds"] else float("nan")
+        flag = "  <-- slower" if ratio > threshold else ""
+        regressions += ratio > threshold
+        print(f"{record['scale']:>5} {record['stage']:<24} {old['best_seconds']:9.3f} "
+              f"{record['best_seconds']:9.3f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the IPL pipeline stages")
+    parser.add_argument("--folder", default=HERE, help="folder with deliveries.csv and matches.csv")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="data sizes to run, as multiples of the input match count (default: 1 10 100)")
+    parser.add_argument("--work-dir", default=os.path.join(HERE, "benchmark_data"),
+                        help="where scaled inputs and stage outputs are written")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic scaled inputs")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per stage")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--no-render", action="store_true", help="skip the figure renders")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", default=None, help="previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="slowdown ratio reported as a regression by --compare")
+    args = parser.parse_args(argv)
+
+    deliveries_path = os.path.join(args.folder, "deliveries.csv")
+    matches_path = os.path.join(args.folder, "matches.csv")
+    if not os.path.exists(deliveries_path):
+        parser.error(f"{deliveries_path} not found")
+
+    records = []
+    for scale in args.scales:
+        scale_dir = os.path.join(args.work_dir, f"x{scale}")
+        print(f"\nScale x{scale}")
+        inputs = (deliveries_path, matches_path) if scale == 1 else \
+            scale_inputs(matches_path, scale, os.path.join(scale_dir, "input"), args.seed)
+        for record in run_scale(*inputs, os.path.join(scale_dir, "output"), args.repeat,
+                                not args.no_memory, not args.no_render):
+            records.append({"scale": scale, **record})
+
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "max_rss_mb": peak_rss_mb(),
+        "repeat": args.repeat,
+        "results": records,
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"\n✓ Saved: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        return 1 if compare(records, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
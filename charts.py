@@ -0,0 +1,437 @@
+"""Figure renderers for the four EDA figure sets.
+
+Each `render_*` function draws one figure from precomputed aggregates and
+saves it, so the figure sets are independent jobs that `render_all` can run
+in a process pool. With `draft=True` a figure is saved at `DRAFT_DPI`
+without the tight layout and bounding-box passes, for quick previews; a
+draft goes to `<name>_draft.png` next to the full-quality file, never over
+it, and is cached under that name.
+
+Report families (one chart per franchise per season, say) are drawn by
+`render_family` on a `BarTemplate`: the figure, axes and bars are built once
+per process and each chart only updates the bar lengths, labels and title
+before saving, so hundreds of charts cost little more than their savefigs:
+
+    python charts.py --family batting --family bowling --draft
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+import render_cache
+from instrumentation import Trace
+from stats_engine import load_cleaned, team_season_leaders
+
+
+# Set style for better-looking plots
+sns.set_style("whitegrid")
+plt.rcParams['figure.figsize'] = (14, 8)
+
+DRAFT_DPI = 72
+
+# Stage trace of the render running in this process; replaced by _run_job
+_trace = Trace()
+
+
+def output_path(path: str, draft: bool = False) -> str:
+    """The file a figure for `path` is written to: drafts get a `_draft` suffix."""
+    if not draft:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_draft{ext}"
+
+
+def _save(fig, path: str, dpi: int, draft: bool = False):
+    # Draft previews skip the layout passes and are written at DRAFT_DPI
+    path = output_path(path, draft)
+    if not draft:
+        plt.tight_layout()
+    with _trace.stage(f'savefig {os.path.basename(path)}'):
+        if draft:
+            plt.savefig(path, dpi=DRAFT_DPI)
+        else:
+            plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+
+def render_batsmen(batsmen_stats_filtered: pd.DataFrame, path: str = 'top_batsmen_analysis.png', dpi: int = 300,
+                   draft: bool = False):
+    """Top batsmen figure from the batter table (already filtered and sorted by runs)."""
+    # Visualization: Top 15 batsmen by runs
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+
+
+    # Plot 1: Top 15 Batsmen by Runs
+    top_batsmen = batsmen_stats_filtered.head(15)
+    axes[0, 0].barh(range(len(top_batsmen)), top_batsmen['runs'], color='steelblue')
+    axes[0, 0].set_yticks(range(len(top_batsmen)))
+    axes[0, 0].set_yticklabels(top_batsmen.index)
+    axes[0, 0].set_xlabel('Runs', fontsize=12)
+    axes[0, 0].set_title('Top 15 Batsmen by Runs', fontsize=14, fontweight='bold')
+    axes[0, 0].invert_yaxis()
+
+
+    # Plot 2: Strike Rate vs Runs (Minimum 50 balls)
+    axes[0, 1].scatter(batsmen_stats_filtered['runs'], batsmen_stats_filtered['strike_rate'],
+                       s=batsmen_stats_filtered['balls_faced']/2, alpha=0.6, c=batsmen_stats_filtered['runs'], cmap='viridis')
+    axes[0, 1].set_xlabel('Total Runs', fontsize=12)
+    axes[0, 1].set_ylabel('Strike Rate', fontsize=12)
+    axes[0, 1].set_title('Strike Rate vs Runs (Bubble size = Balls Faced)', fontsize=14, fontweight='bold')
+    axes[0, 1].grid(True, alpha=0.3)
+
+
+    # Plot 3: Top 10 Batsmen - Fours and Sixes
+    top10_batsmen = batsmen_stats_filtered.head(10)
+    x = np.arange(len(top10_batsmen))
+    width = 0.35
+    axes[1, 0].bar(x - width/2, top10_batsmen['fours'], width, label='Fours', color='orange')
+    axes[1, 0].bar(x + width/2, top10_batsmen['sixes'], width, label='Sixes', color='red')
+    axes[1, 0].set_xlabel('Batsmen', fontsize=12)
+    axes[1, 0].set_ylabel('Count', fontsize=12)
+    axes[1, 0].set_title('Top 10 Batsmen - Fours and Sixes', fontsize=14, fontweight='bold')
+    axes[1, 0].set_xticks(x)
+    axes[1, 0].set_xticklabels(top10_batsmen.index, rotation=45, ha='right')
+    axes[1, 0].legend()
+
+
+    # Plot 4: Top 15 by Strike Rate
+    top_sr = batsmen_stats_filtered.nlargest(15, 'strike_rate')
+    axes[1, 1].barh(range(len(top_sr)), top_sr['strike_rate'], color='seagreen')
+    axes[1, 1].set_yticks(range(len(top_sr)))
+    axes[1, 1].set_yticklabels(top_sr.index)
+    axes[1, 1].set_xlabel('Strike Rate', fontsize=12)
+    axes[1, 1].set_title('Top 15 Batsmen by Strike Rate', fontsize=14, fontweight='bold')
+    axes[1, 1].invert_yaxis()
+
+    _save(fig, path, dpi, draft)
+
+
+def render_bowlers(bowlers_stats_filtered: pd.DataFrame, path: str = 'top_bowlers_analysis.png', dpi: int = 300,
+                   draft: bool = False):
+    """Top bowlers figure from the bowler table (already filtered and sorted by wickets)."""
+    # Visualization: Bowlers Analysis
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+
+
+    # Plot 1: Top 15 Bowlers by Wickets
+    top_bowlers = bowlers_stats_filtered.head(15)
+    axes[0, 0].barh(range(len(top_bowlers)), top_bowlers['wickets'], color='crimson')
+    axes[0, 0].set_yticks(range(len(top_bowlers)))
+    axes[0, 0].set_yticklabels(top_bowlers.index)
+    axes[0, 0].set_xlabel('Wickets', fontsize=12)
+    axes[0, 0].set_title('Top 15 Bowlers by Wickets', fontsize=14, fontweight='bold')
+    axes[0, 0].invert_yaxis()
+
+
+    # Plot 2: Economy Rate vs Wickets
+    axes[0, 1].scatter(bowlers_stats_filtered['economy_rate'], bowlers_stats_filtered['wickets'],
+                       s=bowlers_stats_filtered['balls_bowled']/2, alpha=0.6, c=bowlers_stats_filtered['wickets'], cmap='cool')
+    axes[0, 1].set_xlabel('Economy Rate', fontsize=12)
+    axes[0, 1].set_ylabel('Wickets', fontsize=12)
+    axes[0, 1].set_title('Economy Rate vs Wickets (Bubble size = Balls Bowled)', fontsize=14, fontweight='bold')
+    axes[0, 1].grid(True, alpha=0.3)
+
+
+    # Plot 3: Top 15 Bowlers by Dot Ball Percentage
+    top_dot = bowlers_stats_filtered.nlargest(15, 'dot_ball_percentage')
+    axes[1, 0].barh(range(len(top_dot)), top_dot['dot_ball_percentage'], color='navy')
+    axes[1, 0].set_yticks(range(len(top_dot)))
+    axes[1, 0].set_yticklabels(top_dot.index)
+    axes[1, 0].set_xlabel('Dot Ball Percentage (%)', fontsize=12)
+    axes[1, 0].set_title('Top 15 Bowlers by Dot Ball Percentage', fontsize=14, fontweight='bold')
+    axes[1, 0].invert_yaxis()
+
+
+    # Plot 4: Top 10 Bowlers - Economy Rate
+    top10_eco = bowlers_stats_filtered.nsmallest(10, 'economy_rate')
+    axes[1, 1].barh(range(len(top10_eco)), top10_eco['economy_rate'], color='darkgreen')
+    axes[1, 1].set_yticks(range(len(top10_eco)))
+    axes[1, 1].set_yticklabels(top10_eco.index)
+    axes[1, 1].set_xlabel('Economy Rate', fontsize=12)
+    axes[1, 1].set_title('Best 10 Bowlers by Economy Rate', fontsize=14, fontweight='bold')
+    axes[1, 1].invert_yaxis()
+
+    _save(fig, path, dpi, draft)
+
+
+def render_rivalries(h2h_df: pd.DataFrame, team_wins: pd.Series, path: str = 'team_rivalries_analysis.png',
+                     dpi: int = 300, draft: bool = False):
+    """Head-to-head and total-wins figure."""
+    # Visualization: Team Rivalries
+    fig, axes = plt.subplots(2, 1, figsize=(16, 12))
+
+
+    # Plot 1: Top 12 Rivalries (by number of matches)
+    top_rivalries = h2h_df.head(12)
+    rivalry_labels = (top_rivalries['team_a'] + ' vs ' + top_rivalries['team_b']).tolist()
+    x = np.arange(len(top_rivalries))
+    width = 0.35
+
+
+    axes[0].bar(x - width/2, top_rivalries['a_wins'], width, label='Team A wins', color='skyblue')
+    axes[0].bar(x + width/2, top_rivalries['b_wins'], width, label='Team B wins', color='lightcoral')
+    axes[0].set_xlabel('Teams', fontsize=12)
+    axes[0].set_ylabel('Wins', fontsize=12)
+    axes[0].set_title('Top 12 Rivalries - Head to Head Records', fontsize=14, fontweight='bold')
+    axes[0].set_xticks(x)
+    axes[0].set_xticklabels(rivalry_labels, rotation=45, ha='right', fontsize=9)
+    axes[0].legend()
+    axes[0].grid(True, axis='y', alpha=0.3)
+
+
+    # Plot 2: Most Wins by Team
+    top_teams = team_wins.head(15)
+    axes[1].barh(range(len(top_teams)), top_teams.values, color='gold')
+    axes[1].set_yticks(range(len(top_teams)))
+    axes[1].set_yticklabels(top_teams.index)
+    axes[1].set_xlabel('Number of Wins', fontsize=12)
+    axes[1].set_title('Most Wins by Team (Overall)', fontsize=14, fontweight='bold')
+    axes[1].invert_yaxis()
+
+    _save(fig, path, dpi, draft)
+
+
+def render_winning_factors(toss_wins: pd.Series, decision_impact: pd.Series, top_venues: pd.Series,
+                           season_data: pd.Series, path: str = 'winning_factors_analysis.png', dpi: int = 300,
+                           draft: bool = False):
+    """Toss, venue and season figure."""
+    # Visualization: Winning Factors
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+
+
+    # Plot 1: Toss Winner Success Rate
+    toss_data = pd.Series([toss_wins.get(True, 0), toss_wins.get(False, 0)],
+                           index=['Toss Winner Won', 'Toss Winner Lost'])
+    colors = ['#2ecc71', '#e74c3c']
+    axes[0, 0].pie(toss_data.values, labels=toss_data.index, autopct='%1.1f%%', startangle=90, colors=colors)
+    axes[0, 0].set_title('Toss Winner Match Outcome Impact', fontsize=14, fontweight='bold')
+
+
+    # Plot 2: Toss Decision Impact
+    decision_impact_df = pd.DataFrame({
+        'Decision': decision_impact.index,
+        'Win_Percentage': decision_impact.values
+    })
+    axes[0, 1].bar(decision_impact_df['Decision'], decision_impact_df['Win_Percentage'], color=['#3498db', '#e67e22'])
+    axes[0, 1].set_ylabel('Win Percentage (%)', fontsize=12)
+    axes[0, 1].set_xlabel('Toss Decision', fontsize=12)
+    axes[0, 1].set_title('Toss Decision Impact on Match Outcome', fontsize=14, fontweight='bold')
+    axes[0, 1].set_ylim([0, 100])
+    for i, v in enumerate(decision_impact_df['Win_Percentage']):
+        axes[0, 1].text(i, v + 2, f'{v:.1f}%', ha='center', fontweight='bold')
+
+
+    # Plot 3: Top 12 Venues by Match Count
+    axes[1, 0].barh(range(len(top_venues)), top_venues.values, color='mediumpurple')
+    axes[1, 0].set_yticks(range(len(top_venues)))
+    axes[1, 0].set_yticklabels(top_venues.index, fontsize=10)
+    axes[1, 0].set_xlabel('Number of Matches', fontsize=12)
+    axes[1, 0].set_title('Top 12 Venues by Match Count', fontsize=14, fontweight='bold')
+    axes[1, 0].invert_yaxis()
+
+
+    # Plot 4: Matches by Season
+    axes[1, 1].plot(season_data.index.astype(str), season_data.values, marker='o', linewidth=2, markersize=8, color='darkblue')
+    axes[1, 1].fill_between(range(len(season_data)), season_data.values, alpha=0.3, color='lightblue')
+    axes[1, 1].set_xlabel('Season', fontsize=12)
+    axes[1, 1].set_ylabel('Number of Matches', fontsize=12)
+    axes[1, 1].set_title('Matches Played by Season', fontsize=14, fontweight='bold')
+    axes[1, 1].grid(True, alpha=0.3)
+    plt.setp(axes[1, 1].xaxis.get_majorticklabels(), rotation=45, ha='right')
+
+    _save(fig, path, dpi, draft)
+
+
+def _setup_key() -> str:
+    """Hash of what every figure shares besides its renderer: saving, draft settings and the style."""
+    return render_cache.fingerprint(_save, output_path, DRAFT_DPI, dict(plt.rcParams))
+
+
+def _run_job(job, trace_path: str = None):
+    global _trace
+    render, kwargs = job
+    _trace = Trace(trace_path)
+    path = output_path(kwargs['path'], kwargs.get('draft', False))
+    with _trace.stage(f"render {os.path.basename(path)}"):
+        render(**kwargs)
+    return path, _trace.records
+
+
+def render_all(jobs: list, workers: int = None, use_cache: bool = True, trace: Trace = None):
+    """Render `(render_function, kwargs)` jobs, in parallel when `workers` > 1.
+
+    `workers` defaults to the IPL_RENDER_WORKERS environment variable, then
+    to the number of CPUs. With `use_cache`, a job whose inputs, parameters
+    and renderer are unchanged since its file was last written is skipped.
+    With an enabled `trace`, each render and savefig is added to it as a
+    stage, measured in the process that ran it.
+
+    Returns: (rendered_paths, reused_paths)
+    """
+    # Keyed by the file each job writes, so drafts and full-quality figures are cached apart
+    paths = [output_path(kwargs['path'], kwargs.get('draft', False)) for _, kwargs in jobs]
+    setup = _setup_key()
+    keys = {path: render_cache.fingerprint(setup, render, {k: v for k, v in kwargs.items() if k != 'path'})
+            for path, (render, kwargs) in zip(paths, jobs)}
+    reused = [path for path in keys if use_cache and render_cache.is_fresh(path, keys[path])]
+    jobs = [job for path, job in zip(paths, jobs) if path not in reused]
+
+    workers = workers or int(os.environ.get('IPL_RENDER_WORKERS', 0)) or os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+    run = partial(_run_job, trace_path=trace.path if trace is not None else None)
+    if workers <= 1:
+        results = [run(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, jobs))
+    rendered = [path for path, _ in results]
+    for path, records in results:
+        render_cache.record(path, keys[path])
+        if trace is not None:
+            trace.extend(records)
+    return rendered, reused
+
+
+# ==================== REPORT FAMILIES ====================
+# family -> (player column, team column, measure, axis label, title, bar color);
+# the measure is a stats_engine mask or delivery column
+FAMILIES = {
+    "batting": ("batter", "batting_team", "batsman_runs", "Runs", "Top Run Scorers", 'steelblue'),
+    "bowling": ("bowler", "bowling_team", "wicket", "Wickets", "Top Wicket Takers", 'crimson'),
+}
+FAMILY_TOP = 10
+FAMILY_DIR = "report_charts"
+
+
+class BarTemplate:
+    """A horizontal bar chart built once and redrawn with new data for every chart of a family."""
+
+    def __init__(self, slots: int, xlabel: str, color: str = 'steelblue', figsize=(10, 6)):
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+        self.bars = self.ax.barh(np.arange(slots), np.zeros(slots), color=color)
+        self.ax.set_yticks(np.arange(slots))
+        self.ax.set_xlabel(xlabel, fontsize=12)
+        self.title = self.ax.set_title('', fontsize=14, fontweight='bold')
+        # Fixed margins leave room for the player names, so no chart needs a layout pass
+        self.fig.subplots_adjust(left=0.2, right=0.96, top=0.92, bottom=0.1)
+
+    def draw(self, labels: list, values: list, title: str):
+        """Point the bars, labels and title at one chart's data; unused bars are hidden."""
+        n = len(values)
+        for bar, value in zip(self.bars, values):
+            bar.set_width(value)
+        for bar in self.bars[n:]:
+            bar.set_width(0)
+        self.ax.set_yticklabels(list(labels) + [''] * (len(self.bars) - n))
+        self.ax.set_xlim(0, max(values, default=0) * 1.1 or 1)
+        self.ax.set_ylim(max(n, 1) - 0.5, -0.5)  # top-ranked bar first
+        self.title.set_text(title)
+
+    def save(self, path: str, dpi: int = 300, draft: bool = False):
+        path = output_path(path, draft)
+        with _trace.stage(f'savefig {os.path.basename(path)}'):
+            if draft:
+                self.fig.savefig(path, dpi=DRAFT_DPI)
+            else:
+                self.fig.savefig(path, dpi=dpi, bbox_inches='tight')
+
+    def close(self):
+        plt.close(self.fig)
+
+
+def family_charts(leaders: pd.DataFrame, family: str, out_dir: str = FAMILY_DIR) -> list:
+    """One chart spec (path, labels, values, title) per (season, team) of `stats_engine.team_season_leaders`."""
+    _, _, measure, _, title, _ = FAMILIES[family]
+    charts = []
+    for (season, team), group in leaders.groupby(["season", "team"], sort=True, observed=True):
+        slug = "".join(c if c.isalnum() else "_" for c in f"{season}_{team}")
+        charts.append({
+            'path': os.path.join(out_dir, f"{family}_{slug}.png"),
+            'labels': group["player"].tolist(),
+            'values': group[measure].tolist(),
+            'title': f"{title} - {team} ({season})",
+        })
+    return charts
+
+
+def _render_batch(batch: list, family: str, slots: int, dpi: int, draft: bool, trace_path: str = None):
+    global _trace
+    _, _, _, xlabel, _, color = FAMILIES[family]
+    _trace = Trace(trace_path)
+    template = BarTemplate(slots, xlabel, color)
+    for chart in batch:
+        with _trace.stage(f"render {os.path.basename(output_path(chart['path'], draft))}"):
+            template.draw(chart['labels'], chart['values'], chart['title'])
+            template.save(chart['path'], dpi, draft)
+    template.close()
+    return [output_path(chart['path'], draft) for chart in batch], _trace.records
+
+
+def render_family(charts: list, family: str, slots: int = FAMILY_TOP, dpi: int = 300, draft: bool = False,
+                  workers: int = None, use_cache: bool = True, trace: Trace = None):
+    """Render a family's chart specs (from `family_charts`) on one template per process.
+
+    Charts are dealt round-robin into one batch per worker, so every batch
+    gets a similar mix of teams and seasons; `workers`, `use_cache` and
+    `trace` behave as in `render_all`.
+
+    Returns: (rendered_paths, reused_paths)
+    """
+    setup = render_cache.fingerprint(_setup_key(), _render_batch, BarTemplate.__init__, BarTemplate.draw,
+                                     BarTemplate.save, FAMILIES[family], slots, dpi, draft)
+    keys = {output_path(chart['path'], draft): render_cache.fingerprint(setup, {k: v for k, v in chart.items()
+                                                                                if k != 'path'})
+            for chart in charts}
+    reused = [path for path in keys if use_cache and render_cache.is_fresh(path, keys[path])]
+    charts = [chart for chart in charts if output_path(chart['path'], draft) not in reused]
+    for out_dir in {os.path.dirname(chart['path']) for chart in charts}:
+        os.makedirs(out_dir or ".", exist_ok=True)
+
+    workers = workers or int(os.environ.get('IPL_RENDER_WORKERS', 0)) or os.cpu_count() or 1
+    workers = min(workers, len(charts))
+    run = partial(_render_batch, family=family, slots=slots, dpi=dpi, draft=draft,
+                  trace_path=trace.path if trace is not None else None)
+    batches = [charts[i::workers] for i in range(workers)]
+    if workers <= 1:
+        results = [run(batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, batches))
+    rendered = [path for paths, _ in results for path in paths]
+    render_cache.record_many({path: keys[path] for path in rendered})
+    if trace is not None:
+        for _, records in results:
+            trace.extend(records)
+    return rendered, reused
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-team, per-season chart families")
+    parser.add_argument('--family', action='append', choices=sorted(FAMILIES),
+                        help="family to render; repeat for several (default: all)")
+    parser.add_argument('--folder', default=None, help="folder with the cleaned data (default: current directory)")
+    parser.add_argument('--out-dir', default=FAMILY_DIR, help=f"where the charts are written (default: {FAMILY_DIR})")
+    parser.add_argument('--top', type=int, default=FAMILY_TOP, help="players per chart")
+    parser.add_argument('--draft', action='store_true', help=f"quick previews at {DRAFT_DPI} dpi without a tight bbox")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes used (default: IPL_RENDER_WORKERS or all CPUs)")
+    parser.add_argument('--no-cache', action='store_true', help="re-render charts even if their data is unchanged")
+    args = parser.parse_args()
+
+    matches, deliveries = load_cleaned(args.folder)
+    for family in args.family or sorted(FAMILIES):
+        player, team, measure, *_ = FAMILIES[family]
+        leaders = team_season_leaders(deliveries, matches, player, team, measure, args.top)
+        charts = family_charts(leaders, family, args.out_dir)
+        rendered, reused = render_family(charts, family, args.top, draft=args.draft, workers=args.workers,
+                                         use_cache=not args.no_cache)
+        print(f"✓ Saved: {len(rendered)} {family} charts in {args.out_dir}"
+              + (f" ({len(reused)} reused, data unchanged)" if reused else ""))
@@ -0,0 +1,118 @@
+"""Columnar cache for the cleaned IPL tables.
+
+`preprocess_data` writes a Parquet copy of each cleaned CSV with team,
+player, venue and season columns stored as categoricals and the per-ball
+numeric columns downcast to small integers. `read_table` prefers that cache
+and only re-parses the CSV when the cache is missing or older than it.
+"""
+import os
+import pandas as pd
+
+
+# Columns in each group share one category set so they stay comparable
+# (e.g. `toss_winner == winner`).
+TEAM_COLUMNS = ["batting_team", "bowling_team", "team1", "team2", "toss_winner", "winner"]
+PLAYER_COLUMNS = ["batter", "bowler", "non_striker", "player_dismissed", "fielder", "player_of_match"]
+CATEGORY_COLUMNS = ["season", "city", "venue", "match_type", "toss_decision", "result",
+                    "super_over", "method", "extras_type", "dismissal_kind"]
+SMALL_INT_COLUMNS = ["inning", "over", "ball", "batsman_runs", "extra_runs", "total_runs", "is_wicket"]
+
+
+def _has_parquet_engine() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def cache_path(csv_path: str) -> str:
+    """Path of the columnar cache that sits next to `csv_path`."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def _shared_categorical(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    columns = [c for c in columns if c in df.columns]
+    if not columns:
+        return df
+    values = pd.concat([df[c].dropna().astype(str) for c in columns])
+    dtype = pd.CategoricalDtype(sorted(values.unique()))
+    for c in columns:
+        df[c] = df[c].astype(str).where(df[c].notna()).astype(dtype)
+    return df
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of `df` with categorical name columns and small-int flags."""
+    df = df.copy()
+    df = _shared_categorical(df, TEAM_COLUMNS)
+    df = _shared_categorical(df, PLAYER_COLUMNS)
+    for c in CATEGORY_COLUMNS:
+        if c in df.columns:
+            df[c] = df[c].astype(str).where(df[c].notna()).astype("category")
+    for c in SMALL_INT_COLUMNS:
+        if c in df.columns and df[c].notna().all():
+            df[c] = pd.to_numeric(df[c], downcast="integer")
+    if "match_id" in df.columns:
+        df["match_id"] = df["match_id"].astype("int32")
+    return df
+
+
+def write_cache(df: pd.DataFrame, csv_path: str):
+    """Write the columnar cache for a cleaned CSV.
+
+    Returns the cache path, or None when no Parquet engine is installed.
+    """
+    if not _has_parquet_engine():
+        return None
+    path = cache_path(csv_path)
+    compact_dtypes(df).to_parquet(path, index=False)
+    return path
+
+
+def append_cache(df: pd.DataFrame, csv_path: str):
+    """Add newly cleaned rows to an existing cache.
+
+    Returns the cache path, or None when there is no cache to extend.
+    """
+    path = cache_path(csv_path)
+    if not os.path.exists(path) or not _has_parquet_engine():
+        return None
+    existing = decode_categories(pd.read_parquet(path))
+    return write_cache(pd.concat([existing, df], ignore_index=True), csv_path)
+
+
+def cache_is_fresh(csv_path: str) -> bool:
+    """True when the cache exists and is at least as new as the CSV."""
+    path = cache_path(csv_path)
+    if not os.path.exists(path) or not _has_parquet_engine():
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(path) >= os.path.getmtime(csv_path)
+
+
+def decode_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """Turn categorical columns back into plain string columns."""
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype(df[c].cat.categories.dtype)
+    return df
+
+
+def read_table(csv_path: str, categorical: bool = True, match_ids=None) -> pd.DataFrame:
+    """Load a cleaned table, preferring the columnar cache over the CSV.
+
+    With `categorical=False` the cached categoricals are decoded back to
+    strings, for code that relies on plain-string pandas semantics.
+    `match_ids` restricts a deliveries table to those matches; the filter is
+    pushed down into the Parquet reader when the cache is used.
+    """
+    if cache_is_fresh(csv_path):
+        filters = [("match_id", "in", sorted(int(i) for i in match_ids))] if match_ids is not None else None
+        df = pd.read_parquet(cache_path(csv_path), filters=filters)
+        return df if categorical else decode_categories(df)
+    df = pd.read_csv(csv_path)
+    if match_ids is not None:
+        df = df[df["match_id"].isin(match_ids)].reset_index(drop=True)
+    return df
@@ -0,0 +1,122 @@
+"""Canonical team and player registry.
+
+Every team and player gets a stable integer ID, and every known alternate
+name (legacy franchise names, spelling variants) is stored as an alias of a
+canonical name. The registry is saved as `entity_registry.csv` with one row
+per name:
+
+    kind,id,name,canonical
+    team,3,Delhi Capitals,1
+    team,3,Delhi Daredevils,0
+
+`standardize` maps a column through the registry by factorizing it and
+resolving each distinct value once, so the cost grows with the number of
+distinct names rather than the number of rows.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+
+REGISTRY_NAME = "entity_registry.csv"
+KINDS = ("team", "player")
+
+
+class EntityRegistry:
+    """Stable IDs and alias table for teams and players."""
+
+    def __init__(self):
+        self._ids = {kind: {} for kind in KINDS}      # canonical name -> id
+        self._aliases = {kind: {} for kind in KINDS}  # alias -> canonical name
+
+    @classmethod
+    def load(cls, path: str):
+        """Read a registry file; a missing file gives an empty registry."""
+        registry = cls()
+        if not os.path.exists(path):
+            return registry
+        table = pd.read_csv(path, dtype={"kind": str, "id": np.int64, "name": str, "canonical": np.int8})
+        canonical = table[table["canonical"] == 1]
+        for kind, entity_id, name in zip(canonical["kind"], canonical["id"], canonical["name"]):
+            registry._ids[kind][name] = int(entity_id)
+        names = dict(zip(zip(canonical["kind"], canonical["id"]), canonical["name"]))
+        aliases = table[table["canonical"] == 0]
+        for kind, entity_id, name in zip(aliases["kind"], aliases["id"], aliases["name"]):
+            registry._aliases[kind][name] = names[(kind, entity_id)]
+        return registry
+
+    def save(self, path: str):
+        rows = []
+        for kind in KINDS:
+            ids = self._ids[kind]
+            rows += [(kind, entity_id, name, 1) for name, entity_id in ids.items()]
+            rows += [(kind, ids[canonical], alias, 0) for alias, canonical in self._aliases[kind].items()]
+        table = pd.DataFrame(rows, columns=["kind", "id", "name", "canonical"])
+        table.sort_values(["kind", "id", "canonical", "name"], ascending=[True, True, False, True]).to_csv(path, index=False)
+
+    def _next_id(self, kind: str) -> int:
+        return max(self._ids[kind].values(), default=-1) + 1
+
+    def register(self, kind: str, names) -> None:
+        """Give every new canonical name in `names` the next free ID."""
+        ids = self._ids[kind]
+        aliases = self._aliases[kind]
+        next_id = self._next_id(kind)
+        for name in names:
+            if name not in ids and name not in aliases:
+                ids[name] = next_id
+                next_id += 1
+
+    def add_aliases(self, kind: str, mapping: dict) -> None:
+        """Record `alias -> canonical` pairs, registering canonical names as needed."""
+        aliases = self._aliases[kind]
+        for alias, canonical in mapping.items():
+            canonical = aliases.get(canonical, canonical)
+            if alias == canonical:
+                continue
+            self.register(kind, [canonical])
+            # A name that was canonical before becoming an alias keeps no ID of its own
+            self._ids[kind].pop(alias, None)
+            aliases[alias] = canonical
+            for other, target in aliases.items():
+                if target == alias:
+                    aliases[other] = canonical
+
+    def canonical(self, kind: str, name: str) -> str:
+        return self._aliases[kind].get(name, name)
+
+    def id_of(self, kind: str, name: str) -> int:
+        return self._ids[kind][self.canonical(kind, name)]
+
+    def names(self, kind: str) -> pd.Series:
+        """Canonical names indexed by ID."""
+        ids = self._ids[kind]
+        return pd.Series(list(ids), index=pd.Index(list(ids.values()), name="id"), name="name").sort_index()
+
+    def aliases(self, kind: str) -> dict:
+        return dict(self._aliases[kind])
+
+    def standardize(self, s: pd.Series, kind: str, register: bool = True) -> pd.Series:
+        """Replace aliases in `s` with canonical names, resolving each distinct value once.
+
+        New canonical names are given IDs unless `register` is False.
+        Missing values stay missing.
+        """
+        codes, uniques = pd.factorize(s)
+        aliases = self._aliases[kind]
+        canonical = np.array([aliases.get(name, name) for name in uniques], dtype=object)
+        if register:
+            self.register(kind, canonical)
+        if not any(name in aliases for name in uniques):
+            return s
+        values = canonical.take(np.maximum(codes, 0))
+        values[codes < 0] = np.nan
+        return pd.Series(values, index=s.index, name=s.name)
+
+    def codes(self, s: pd.Series, kind: str) -> np.ndarray:
+        """Registry IDs for a column of names (-1 for missing or unknown names)."""
+        codes, uniques = pd.factorize(s)
+        ids = self._ids[kind]
+        # The trailing -1 is picked up by the -1 codes pandas gives missing values
+        lookup = np.array([ids.get(self.canonical(kind, name), -1) for name in uniques] + [-1], dtype=np.int64)
+        return lookup[codes]
@@ -1,139 +1,125 @@
+import argparse
 import pandas as pd
-import numpy as np
-
-# Load the cleaned data
-matches = pd.read_csv('matches_cleaned.csv')
-deliveries = pd.read_csv('deliveries_cleaned.csv')
-
-print("Generating detailed CSV reports...")
-
-# ==================== TOP BATSMEN REPORT ====================
-batsmen_stats = deliveries.groupby('batter').agg({
-    'batsman_runs': 'sum',
-    'ball': 'count',
-}).rename(columns={'batsman_runs': 'runs', 'ball': 'balls_faced'})
-
-fours = deliveries[deliveries['batsman_runs'] == 4].groupby('batter').size()
-sixes = deliveries[deliveries['batsman_runs'] == 6].groupby('batter').size()
-
-batsmen_stats['fours'] = fours
-batsmen_stats['sixes'] = sixes
-batsmen_stats = batsmen_stats.fillna(0).astype({'fours': int, 'sixes': int})
-batsmen_stats['strike_rate'] = (batsmen_stats['runs'] / batsmen_stats['balls_faced'] * 100).round(2)
-batsmen_stats = batsmen_stats.sort_values('runs', ascending=False)
-
-batsmen_stats.to_csv('batsmen_detailed_stats.csv')
-print("✓ Saved: batsmen_detailed_stats.csv")
-
-# ==================== TOP BOWLERS REPORT ====================
-bowlers_stats = pd.DataFrame()
-
-wickets = deliveries[deliveries['is_wicket'] == 1].groupby('bowler').size()
-balls_bowled = deliveries.groupby('bowler').size()
-runs_conceded = deliveries.groupby('bowler')['total_runs'].sum()
-dot_balls = deliveries[deliveries['bowler'].notna() & (deliveries['total_runs'] == 0)].groupby('bowler').size()
-
-bowlers_stats['wickets'] = wickets
-bowlers_stats['balls_bowled'] = balls_bowled
-bowlers_stats['runs_conceded'] = runs_conceded
-bowlers_stats['overs'] = (bowlers_stats['balls_bowled'] / 6).round(2)
-bowlers_stats['economy_rate'] = (bowlers_stats['runs_conceded'] / (bowlers_stats['balls_bowled'] / 6)).round(2)
-bowlers_stats['dot_balls'] = dot_balls
-bowlers_stats['dot_ball_percentage'] = ((bowlers_stats['dot_balls'] / bowlers_stats['balls_bowled']) * 100).round(2)
-bowlers_stats = bowlers_stats.fillna(0).astype({'wickets': int, 'dot_balls': int})
-bowlers_stats = bowlers_stats.sort_values('wickets', ascending=False)
-
-bowlers_stats.to_csv('bowlers_detailed_stats.csv')
-print("✓ Saved: bowlers_detailed_stats.csv")
-
-# ==================== TEAM RIVALRIES REPORT ====================
-h2h_records = {}
-
-for idx, row in matches.iterrows():
-    team1 = row['team1']
-    team2 = row['team2']
-    winner = row['winner']
-    
-    teams = tuple(sorted([team1, team2]))
-    
-    if teams not in h2h_records:
-        h2h_records[teams] = {'total': 0, team1: 0, team2: 0}
-    
-    h2h_records[teams]['total'] += 1
-    
-    if pd.notna(winner):
-        if winner == team1 or winner == team2:
-            h2h_records[teams][winner] += 1
-
-h2h_list = []
-for teams, record in h2h_records.items():
-    h2h_list.append({
-        'Team1': teams[0],
-        'Team2': teams[1],
-        f'{teams[0]}_Wins': record[teams[0]],
-        f'{teams[1]}_Wins': record[teams[1]],
-        'Total_Matches': record['total']
-    })
 
-h2h_df = pd.DataFrame(h2h_list).sort_values('Total_Matches', ascending=False)
-h2h_df.to_csv('team_rivalries_h2h.csv', index=False)
-print("✓ Saved: team_rivalries_h2h.csv")
-
-# Team wins report
-team_wins = matches[matches['winner'].notna()].groupby('winner').size().sort_values(ascending=False)
-team_wins_df = pd.DataFrame({
-    'Team': team_wins.index,
-    'Total_Wins': team_wins.values
-})
-team_wins_df.to_csv('team_wins_overall.csv', index=False)
-print("✓ Saved: team_wins_overall.csv")
-
-# ==================== WINNING FACTORS REPORT ====================
-toss_analysis = matches[matches['winner'].notna()].copy()
-toss_analysis['toss_won'] = toss_analysis['toss_winner'] == toss_analysis['winner']
-toss_analysis['toss_decision'] = toss_analysis['toss_decision']
-
-toss_decision_impact = toss_analysis.groupby('toss_decision').agg({
-    'toss_won': ['sum', 'count']
-}).to_dict()
-
-toss_decision_stats = []
-for decision in toss_analysis['toss_decision'].unique():
-    if pd.notna(decision):
-        subset = toss_analysis[toss_analysis['toss_decision'] == decision]
-        wins = subset['toss_won'].sum()
-        total = len(subset)
-        win_pct = (wins / total * 100) if total > 0 else 0
-        
-        toss_decision_stats.append({
-            'Decision': decision,
-            'Wins_When_Toss_Won': wins,
-            'Total_Matches': total,
-            'Win_Percentage': round(win_pct, 2)
-        })
-
-toss_decision_df = pd.DataFrame(toss_decision_stats)
-toss_decision_df.to_csv('toss_decision_impact.csv', index=False)
-print("✓ Saved: toss_decision_impact.csv")
-
-# Venue analysis
-venue_stats = matches[matches['winner'].notna()].groupby('venue').agg({
-    'id': 'count',
-    'winner': 'count'
-}).rename(columns={'id': 'total_matches', 'winner': 'decided_matches'})
-venue_stats = venue_stats.sort_values('total_matches', ascending=False)
-venue_stats.to_csv('venue_statistics.csv')
-print("✓ Saved: venue_statistics.csv")
-
-# Season analysis
-season_stats = matches.groupby('season').agg({
-    'id': 'count',
-    'winner': lambda x: x.notna().sum()
-}).rename(columns={'id': 'total_matches', 'winner': 'decided_matches'})
-season_stats = season_stats.sort_index()
-season_stats.to_csv('season_statistics.csv')
-print("✓ Saved: season_statistics.csv")
-
-print("\n" + "="*50)
-print("All detailed reports generated successfully!")
-print("="*50)
+from aggregate_store import delivery_partials, report_tables, sync
+from data_store import read_table
+from instrumentation import Trace
+from partnerships import best_pairs, by_wicket, partnerships
+from player_form import form_tables
+from render_cache import save_csv
+from stats_engine import load_cleaned, compute_aggregates, head_to_head, toss_decision_stats
+from win_rate_ci import winning_factor_intervals
+
+
+def main(trace_path: str = None, incremental: bool = False, workers: int = 1):
+    print("Generating detailed CSV reports...")
+
+    reused = []
+
+    # Per-stage timings are only recorded with --trace [PATH] or IPL_TRACE=PATH
+    trace = Trace.from_env(trace_path)
+
+    def save_report(df, path, **to_csv_kwargs):
+        # Skip writing when the table is identical to the one already on disk
+        with trace.stage(f'save {path}', rows=len(df)):
+            written = save_csv(df, path, **to_csv_kwargs)
+        if written:
+            print(f"✓ Saved: {path}")
+        else:
+            reused.append(path)
+
+    if incremental:
+        # Fold only matches not yet in the aggregate store into its running totals
+        with trace.stage('load') as stage:
+            matches = read_table('matches_cleaned.csv', categorical=False)
+            stage['rows'] = len(matches)
+        with trace.stage('aggregates'):
+            aggregates = report_tables(sync())
+            aggregates['rivalries'] = head_to_head(matches)
+            aggregates['toss_decisions'] = toss_decision_stats(matches)
+    else:
+        # Load the cleaned data; all tables come from one pass of the stats engine
+        with trace.stage('load') as stage:
+            matches, deliveries = load_cleaned()
+            stage['rows'] = len(deliveries)
+        with trace.stage('aggregates', rows=len(deliveries)):
+            aggregates = compute_aggregates(deliveries, matches)
+        with trace.stage('form', rows=len(deliveries)):
+            aggregates.update(form_tables(delivery_partials(deliveries), matches))
+        with trace.stage('partnerships', rows=len(deliveries)):
+            aggregates['partnerships'] = partnerships(deliveries)
+
+    # ==================== TOP BATSMEN REPORT ====================
+    batsmen_stats = aggregates['batsmen'].sort_values('runs', ascending=False)
+
+    save_report(batsmen_stats, 'batsmen_detailed_stats.csv')
+
+    # ==================== TOP BOWLERS REPORT ====================
+    bowlers_stats = aggregates['bowlers'].sort_values('wickets', ascending=False)
+
+    save_report(bowlers_stats, 'bowlers_detailed_stats.csv')
+
+    # ==================== PLAYER FORM REPORT ====================
+    # Last-N-innings and exponentially decayed form, most in-form players first
+    batsmen_form = aggregates['batsmen_form'].sort_values('ewm_runs', ascending=False, kind='stable')
+    save_report(batsmen_form, 'batsmen_form.csv')
+
+    bowlers_form = aggregates['bowlers_form'].sort_values('ewm_wickets', ascending=False, kind='stable')
+    save_report(bowlers_form, 'bowlers_form.csv')
+
+    # ==================== PARTNERSHIPS REPORT ====================
+    partnership_df = aggregates['partnerships']
+    save_report(best_pairs(partnership_df), 'partnership_pairs.csv')
+    save_report(by_wicket(partnership_df), 'partnerships_by_wicket.csv')
+
+    # ==================== TEAM RIVALRIES REPORT ====================
+    h2h_df = aggregates['rivalries']
+    save_report(h2h_df, 'team_rivalries_h2h.csv', index=False)
+
+    # Team wins report
+    team_wins = aggregates['team_wins']
+    team_wins_df = pd.DataFrame({
+        'Team': team_wins.index,
+        'Total_Wins': team_wins.values
+    })
+    save_report(team_wins_df, 'team_wins_overall.csv', index=False)
+
+    # ==================== WINNING FACTORS REPORT ====================
+    toss_decision_df = aggregates['toss_decisions']
+    save_report(toss_decision_df, 'toss_decision_impact.csv', index=False)
+
+    # Bootstrap intervals and permutation p-values for the toss, decision and venue win rates
+    with trace.stage('winning_factors_ci', rows=len(matches)):
+        winning_factors_ci = winning_factor_intervals(matches, workers=workers)
+    save_report(winning_factors_ci, 'winning_factors_ci.csv', index=False)
+
+    # Venue analysis
+    venue_stats = aggregates['venues']
+    save_report(venue_stats, 'venue_statistics.csv')
+
+    # Season analysis
+    season_stats = aggregates['seasons']
+    save_report(season_stats, 'season_statistics.csv')
+
+    for path in reused:
+        print(f"↺ Reused (inputs unchanged): {path}")
+
+    print("\n" + "="*50)
+    print("All detailed reports generated successfully!")
+    print("="*50)
+
+    if trace.write():
+        print(f"\n✓ Saved stage trace: {trace.path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detailed IPL CSV reports")
+    parser.add_argument('--incremental', action='store_true',
+                        help="fold only matches not yet in the aggregate store into its running totals")
+    parser.add_argument('--trace', nargs='?', const='reports_trace.json', default=None, metavar='PATH',
+                        help="write per-stage wall/CPU time, peak RSS and row counts to PATH "
+                             "(.json or .csv, default reports_trace.json); IPL_TRACE=PATH does the same")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes used for the winning-factor resampling (default: 1)")
+    args = parser.parse_args()
+    main(args.trace, incremental=args.incremental, workers=args.workers)
@@ -0,0 +1,88 @@
+"""Optional per-stage timing and memory trace for the pipeline scripts.
+
+A `Trace` records, for every named stage, its wall time, CPU time, the
+process's peak RSS so far and an optional row count, and writes them as a
+JSON or CSV trace at the end of the run. Tracing is off unless a path is
+given, either by the script's `--trace` flag or the IPL_TRACE environment
+variable; a disabled trace's stages cost nothing.
+
+    trace = Trace.from_env(args.trace)
+    with trace.stage("load") as stage:
+        matches, deliveries = load_cleaned()
+        stage["rows"] = len(deliveries)
+    trace.write()
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+ENV_VAR = "IPL_TRACE"
+
+
+def peak_rss_mb() -> float:
+    """High-water resident set size of this process so far, in MB (None where unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+class Trace:
+    """Collects stage records and writes them to `path` (.json or .csv)."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.records = []
+
+    @classmethod
+    def from_env(cls, path: str = None):
+        """Trace to `path`, else to $IPL_TRACE, else a disabled trace."""
+        return cls(path or os.environ.get(ENV_VAR) or None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        """Record the enclosed block as stage `name`; set `["rows"]` on the yielded dict to add a row count."""
+        record = {"stage": name, "rows": rows}
+        if not self.enabled:
+            yield record
+            return
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.update({
+                "wall_seconds": round(time.perf_counter() - wall, 6),
+                "cpu_seconds": round(time.process_time() - cpu, 6),
+                "peak_rss_mb": peak_rss_mb(),
+                "pid": os.getpid(),
+            })
+            self.records.append(record)
+
+    def extend(self, records: list):
+        """Add records measured elsewhere, e.g. in worker processes."""
+        if self.enabled:
+            self.records.extend(records)
+
+    def write(self):
+        """Write the trace. Returns its path, or None when tracing is off."""
+        if not self.enabled:
+            return None
+        if self.path.endswith(".csv"):
+            pd.DataFrame(self.records, columns=["stage", "rows", "wall_seconds", "cpu_seconds",
+                                                "peak_rss_mb", "pid"]).to_csv(self.path, index=False)
+        else:
+            with open(self.path, "w") as f:
+                json.dump({"script": os.path.basename(sys.argv[0]), "stages": self.records}, f, indent=1)
+        return self.path
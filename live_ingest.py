@@ -0,0 +1,281 @@
+"""Live ball-by-ball ingest with running batter, bowler and innings totals.
+
+Delivery events are JSON objects, one per line, with the columns of
+`deliveries.csv`. They are read from a tailed file or from producers
+connecting to a local socket; `--replay` is a stand-in producer that sends
+the rows of a deliveries file at a fixed rate:
+
+    python live_ingest.py --file live_feed.jsonl --interval 5
+    python live_ingest.py --listen 127.0.0.1:8765 --interval 5
+    python live_ingest.py --replay deliveries.csv --connect 127.0.0.1:8765 --rate 200
+
+Each event's team and player names are standardised through the same
+registry as preprocessing, then added into running totals kept in dicts,
+a constant amount of work per ball. Batter and bowler totals start from the
+aggregate store, so the snapshots are career figures including the live
+balls; balls of matches already in the store are ignored. Every
+`--interval` seconds, if anything changed, the batter and bowler reports
+and `live_scorecard.csv` (one row per match innings) are rewritten. Each
+file is replaced in one step, so readers never see a partly written file.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import time
+
+import pandas as pd
+
+import aggregate_store
+import render_cache
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCORECARD_NAME = "live_scorecard.csv"
+BATTING = ["runs", "balls_faced", "fours", "sixes"]
+BOWLING = ["wickets", "balls_bowled", "runs_conceded", "dot_balls"]
+SCORECARD = ["runs", "wickets", "balls", "last_ball"]
+
+
+def _load_registry(folder: str):
+    # The preprocessing script's file name is not an importable module name
+    spec = importlib.util.spec_from_file_location("preprocessing", os.path.join(HERE, "Data pre processsing.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module._load_registry(folder)
+
+
+class LiveStats:
+    """Running totals updated one delivery at a time."""
+
+    def __init__(self, registry, totals: dict = None, done_matches: set = None):
+        self.registry = registry
+        self.done = done_matches or set()
+        self.batsmen, self.bowlers, self.innings = {}, {}, {}
+        if totals is not None:
+            self.batsmen = {name: row for name, row in zip(totals["batsmen"].index,
+                                                           totals["batsmen"][BATTING].to_numpy().tolist())}
+            self.bowlers = {name: row for name, row in zip(totals["bowlers"].index,
+                                                           totals["bowlers"][BOWLING].to_numpy().tolist())}
+        self.balls = 0
+        self.skipped = 0
+        self.changed = False
+
+    def add(self, event: dict) -> bool:
+        """Fold one delivery in. Returns False for a ball of a match already in the store."""
+        match_id = int(event["match_id"])
+        if match_id in self.done:
+            self.skipped += 1
+            return False
+        canonical = self.registry.canonical
+        batter = canonical("player", event["batter"])
+        bowler = canonical("player", event["bowler"])
+        batting_team = canonical("team", event["batting_team"])
+        runs = int(event["batsman_runs"])
+        total = int(event["total_runs"])
+        wicket = int(event["is_wicket"]) == 1
+        # Every field is read before any total changes, so a bad event leaves no partial update
+        key = (match_id, int(event["inning"]), batting_team)
+        last_ball = f"{int(event['over'])}.{int(event['ball'])}"
+
+        batting = self.batsmen.setdefault(batter, [0, 0, 0, 0])
+        batting[0] += runs
+        batting[1] += 1
+        batting[2] += runs == 4
+        batting[3] += runs == 6
+
+        bowling = self.bowlers.setdefault(bowler, [0, 0, 0, 0])
+        bowling[0] += wicket
+        bowling[1] += 1
+        bowling[2] += total
+        bowling[3] += total == 0
+
+        card = self.innings.setdefault(key, [0, 0, 0, ""])
+        card[0] += total
+        card[1] += wicket
+        card[2] += 1
+        card[3] = last_ball
+
+        self.balls += 1
+        self.changed = True
+        return True
+
+    def snapshot(self) -> dict:
+        """Report tables of the current totals, shaped like generate_reports.py's."""
+        batsmen = pd.DataFrame.from_dict(self.batsmen, orient="index", columns=BATTING).rename_axis("batter")
+        bowlers = pd.DataFrame.from_dict(self.bowlers, orient="index", columns=BOWLING).rename_axis("bowler")
+        batsmen = aggregate_store.derive_rates("batsmen", batsmen.astype("int64").sort_index())
+        bowlers = aggregate_store.derive_rates("bowlers", bowlers.astype("int64").sort_index())
+        bowlers = bowlers[bowlers["wickets"] > 0]
+        scorecard = pd.DataFrame([(*key, *card) for key, card in self.innings.items()],
+                                 columns=["match_id", "inning", "batting_team", *SCORECARD])
+        scorecard["run_rate"] = (scorecard["runs"] / (scorecard["balls"] / 6)).round(2)
+        self.changed = False
+        return {
+            "batsmen_detailed_stats.csv": (batsmen.sort_values('runs', ascending=False), {}),
+            "bowlers_detailed_stats.csv": (bowlers[["wickets", "balls_bowled", "runs_conceded", "overs",
+                                                    "economy_rate", "dot_balls", "dot_ball_percentage"]]
+                                           .sort_values('wickets', ascending=False), {}),
+            SCORECARD_NAME: (scorecard.sort_values(["match_id", "inning"], kind="stable"), {"index": False}),
+        }
+
+
+def write_snapshot(tables: dict, out_dir: str) -> list:
+    """Replace each report file in one step. Returns: paths written."""
+    written = []
+    for name, (df, to_csv_kwargs) in tables.items():
+        path = os.path.join(out_dir, name)
+        key = render_cache.fingerprint(df, to_csv_kwargs)
+        if render_cache.is_fresh(path, key):
+            continue
+        df.to_csv(path + ".tmp", **to_csv_kwargs)
+        os.replace(path + ".tmp", path)
+        render_cache.record(path, key)
+        written.append(path)
+    return written
+
+
+# ==================== SOURCES ====================
+# Async iterators of event dicts
+
+def _parse(line: str):
+    """Event of one feed line; None (after a message) for a line that is not JSON."""
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        print(f"✗ Skipped unreadable line: {line.strip()[:200]}")
+        return None
+
+
+async def tail_file(path: str, from_start: bool = False, poll: float = 0.2):
+    """Events appended to `path`; with `from_start`, the lines already in it come first."""
+    with open(path) as f:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        pending = ""
+        while True:
+            line = f.readline()
+            if not line:
+                await asyncio.sleep(poll)
+                continue
+            pending += line
+            # A line without its newline is still being written
+            if not pending.endswith("\n"):
+                continue
+            event = _parse(pending) if pending.strip() else None
+            pending = ""
+            if event is not None:
+                yield event
+
+
+async def listen(host: str, port: int):
+    """Events sent by any producer connecting to `host:port`."""
+    queue = asyncio.Queue()
+
+    async def handle(reader, writer):
+        async for line in reader:
+            event = _parse(line) if line.strip() else None
+            if event is not None:
+                await queue.put(event)
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        while True:
+            yield await queue.get()
+
+
+async def replay(deliveries_path: str, host: str, port: int, rate: float = 100.0):
+    """Stand-in producer: send every row of a deliveries file as an event, `rate` per second."""
+    _, writer = await asyncio.open_connection(host, port)
+    delay = 1 / rate if rate else 0
+    for chunk in pd.read_csv(deliveries_path, chunksize=10_000):
+        for event in chunk.to_dict("records"):
+            event = {k: (None if pd.isna(v) else v) for k, v in event.items()}
+            writer.write((json.dumps(event) + "\n").encode())
+            await writer.drain()
+            await asyncio.sleep(delay)
+    writer.close()
+    await writer.wait_closed()
+
+
+# ==================== CONSUMER ====================
+
+async def ingest(events, stats: LiveStats, out_dir: str, interval: float = 5.0, idle_timeout: float = None):
+    """Feed `events` into `stats`, writing a snapshot every `interval` seconds while anything changed.
+
+    Stops when the source ends or, with `idle_timeout`, after that many
+    seconds without an event; a last snapshot is written on the way out.
+    """
+    async def flush():
+        if stats.changed:
+            tables = stats.snapshot()
+            for path in await asyncio.to_thread(write_snapshot, tables, out_dir):
+                print(f"✓ Saved: {path} ({stats.balls} live balls)")
+
+    async def flush_periodically():
+        # A snapshot being written is let finish rather than cancelled
+        while True:
+            try:
+                await asyncio.wait_for(stopped.wait(), interval)
+                return
+            except asyncio.TimeoutError:
+                await flush()
+
+    os.makedirs(out_dir, exist_ok=True)
+    stopped = asyncio.Event()
+    flusher = asyncio.create_task(flush_periodically())
+    events = aiter(events)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(anext(events), idle_timeout)
+            except (StopAsyncIteration, asyncio.TimeoutError):
+                break
+            try:
+                stats.add(event)
+            except (KeyError, TypeError, ValueError) as exc:
+                print(f"✗ Skipped malformed event ({exc!r}): {event}")
+    finally:
+        stopped.set()
+        await flusher
+        await flush()
+
+
+def _address(value: str) -> tuple:
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live ball-by-ball ingest")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--file', help="tail this JSON-lines feed")
+    source.add_argument('--listen', metavar='HOST:PORT', help="accept producers on this address")
+    source.add_argument('--replay', metavar='DELIVERIES_CSV', help="send a deliveries file to --connect")
+    parser.add_argument('--from-start', action='store_true', help="with --file, read the lines already in it")
+    parser.add_argument('--connect', default='127.0.0.1:8765', metavar='HOST:PORT', help="where --replay sends")
+    parser.add_argument('--rate', type=float, default=100.0, help="--replay events per second (0: no pause)")
+    parser.add_argument('--interval', type=float, default=5.0, help="seconds between snapshots")
+    parser.add_argument('--idle-timeout', type=float, default=None, help="stop after this many seconds without events")
+    parser.add_argument('--folder', default=None, help="folder with the cleaned data (default: current directory)")
+    parser.add_argument('--out-dir', default=None, help="where snapshots are written (default: --folder)")
+    args = parser.parse_args()
+
+    if args.replay:
+        asyncio.run(replay(args.replay, *_address(args.connect), rate=args.rate))
+    else:
+        folder = args.folder or os.getcwd()
+        store_dir = os.path.join(folder, aggregate_store.STORE_DIR)
+        started = time.perf_counter()
+        stats = LiveStats(_load_registry(folder), aggregate_store.sync(folder),
+                          aggregate_store._read_match_ids(store_dir))
+        print(f"Loaded totals for {len(stats.batsmen)} batters and {len(stats.bowlers)} bowlers "
+              f"in {time.perf_counter() - started:.2f}s")
+        events = tail_file(args.file, args.from_start) if args.file else listen(*_address(args.listen))
+        try:
+            asyncio.run(ingest(events, stats, args.out_dir or folder, args.interval, args.idle_timeout))
+        except KeyboardInterrupt:
+            pass
+        print(f"Ingested {stats.balls} balls ({stats.skipped} from matches already in the store)")
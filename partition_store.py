@@ -0,0 +1,202 @@
+"""Season-partitioned on-disk layout for the cleaned tables.
+
+The store keeps matches and deliveries in one directory per season (and
+optionally per venue inside it), e.g.
+
+    cleaned_store/season=2023/deliveries-0000.parquet
+    cleaned_store/season=2023/venue=Eden-Gardens/matches-0000.parquet
+
+`_metadata.json` lists every part file with its partition values, row count
+and min/max match id and date. Filtered loads read the metadata first and
+open only the parts whose partition values and min/max ranges can match, so
+a question about one season does not read the whole history.
+
+Each write adds new part files, so appending a match or streaming a large
+file never rewrites existing partitions. The metadata also records the
+modification time and size of the cleaned CSVs the store was written
+alongside; once either CSV is rewritten without the store (a run without
+`--partition`), `is_fresh` is False and loaders fall back to the CSVs.
+"""
+import json
+import os
+import re
+import shutil
+import numpy as np
+import pandas as pd
+
+from data_store import _has_parquet_engine, compact_dtypes, decode_categories
+
+
+STORE_NAME = "cleaned_store"
+METADATA_NAME = "_metadata.json"
+
+
+def _slug(value) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", str(value)).strip("-")
+
+
+def _load_metadata(root: str) -> dict:
+    with open(os.path.join(root, METADATA_NAME)) as f:
+        return json.load(f)
+
+
+def _save_metadata(root: str, metadata: dict):
+    with open(os.path.join(root, METADATA_NAME), "w") as f:
+        json.dump(metadata, f, indent=1)
+
+
+def exists(root: str) -> bool:
+    return os.path.exists(os.path.join(root, METADATA_NAME))
+
+
+def _source_stamps(csv_paths) -> dict:
+    stamps = {}
+    for path in csv_paths:
+        if os.path.exists(path):
+            st = os.stat(path)
+            stamps[os.path.basename(path)] = [st.st_mtime_ns, st.st_size]
+    return stamps
+
+
+def record_sources(root: str, csv_paths):
+    """Mark the store as matching the cleaned CSVs as they are now."""
+    metadata = _load_metadata(root)
+    metadata["sources"] = _source_stamps(csv_paths)
+    _save_metadata(root, metadata)
+
+
+def is_fresh(root: str, csv_paths) -> bool:
+    """True when the store exists and the cleaned CSVs are unchanged since `record_sources`."""
+    return exists(root) and _load_metadata(root).get("sources") == _source_stamps(csv_paths)
+
+
+def reset_store(root: str, by_venue: bool = False):
+    """Create an empty store at `root`, removing any previous one."""
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+    os.makedirs(root)
+    _save_metadata(root, {"partition_by": ["season", "venue"] if by_venue else ["season"], "parts": []})
+
+
+def _add_parts(root: str, table: str, df: pd.DataFrame, keys: pd.DataFrame, dates: pd.Series):
+    """Write one part per partition present in `df`. `keys` and `dates` are aligned with `df`."""
+    metadata = _load_metadata(root)
+    partition_by = metadata["partition_by"]
+    parquet = _has_parquet_engine()
+    counts = {}  # existing parts of this table per partition directory
+    for part in metadata["parts"]:
+        if part["table"] == table:
+            directory = os.path.dirname(part["path"]).replace("/", os.sep)
+            counts[directory] = counts.get(directory, 0) + 1
+
+    grouped = df.groupby([keys[k].astype(str).to_numpy() for k in partition_by], sort=True)
+    for values, rows in grouped.groups.items():
+        values = values if isinstance(values, tuple) else (values,)
+        directory = os.path.join(*[f"{k}={_slug(v)}" for k, v in zip(partition_by, values)])
+        n = counts.get(directory, 0)
+        counts[directory] = n + 1
+        path = os.path.join(directory, f"{table}-{n:04d}.{'parquet' if parquet else 'csv'}")
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+        part = df.loc[rows]
+        id_column = "id" if table == "matches" else "match_id"
+        if parquet:
+            compact_dtypes(part).to_parquet(os.path.join(root, path), index=False)
+        else:
+            part.to_csv(os.path.join(root, path), index=False)
+        part_dates = dates.loc[rows].dropna().astype(str)
+        metadata["parts"].append({
+            "table": table,
+            "path": path.replace(os.sep, "/"),
+            **dict(zip(partition_by, values)),
+            "rows": int(len(part)),
+            "min_match_id": int(part[id_column].min()),
+            "max_match_id": int(part[id_column].max()),
+            "min_date": part_dates.min() if len(part_dates) else None,
+            "max_date": part_dates.max() if len(part_dates) else None,
+        })
+    _save_metadata(root, metadata)
+
+
+def add_matches(root: str, matches: pd.DataFrame):
+    """Add cleaned matches to the store."""
+    _add_parts(root, "matches", matches, matches, matches["date"])
+
+
+def add_deliveries(root: str, deliveries: pd.DataFrame, matches: pd.DataFrame):
+    """Add cleaned deliveries to the store; `matches` supplies each match's season, venue and date."""
+    lookup = matches.set_index("id")[["season", "venue", "date"]]
+    keys = lookup.reindex(deliveries["match_id"].to_numpy())
+    keys.index = deliveries.index
+    known = keys["season"].notna()
+    _add_parts(root, "deliveries", deliveries[known], keys[known], keys.loc[known, "date"])
+
+
+def _selected(part: dict, seasons, venues, date_from, date_to) -> bool:
+    if seasons is not None and part["season"] not in seasons:
+        return False
+    if venues is not None and "venue" in part and part["venue"] not in venues:
+        return False
+    if date_from is not None and part["max_date"] is not None and part["max_date"] < date_from:
+        return False
+    if date_to is not None and part["min_date"] is not None and part["min_date"] > date_to:
+        return False
+    return True
+
+
+def plan(root: str, table: str, seasons=None, venues=None, date_from=None, date_to=None) -> list:
+    """Metadata entries of the parts a filtered load would read."""
+    seasons = None if seasons is None else {str(s) for s in ([seasons] if isinstance(seasons, (str, int)) else seasons)}
+    venues = None if venues is None else set([venues] if isinstance(venues, str) else venues)
+    return [part for part in _load_metadata(root)["parts"]
+            if part["table"] == table and _selected(part, seasons, venues, date_from, date_to)]
+
+
+def _read_parts(root: str, table: str, parts: list) -> pd.DataFrame:
+    if not parts:
+        # An empty selection still returns the table's columns
+        first = [part for part in _load_metadata(root)["parts"] if part["table"] == table][:1]
+        return _read_parts(root, table, first).iloc[:0] if first else pd.DataFrame()
+    frames = []
+    for part in parts:
+        path = os.path.join(root, part["path"])
+        if path.endswith(".parquet"):
+            frames.append(decode_categories(pd.read_parquet(path)))
+        else:
+            frames.append(pd.read_csv(path))
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_partitioned(root: str, seasons=None, venues=None, date_from: str = None, date_to: str = None,
+                     categorical: bool = True):
+    """Load matches and deliveries, reading only the partitions the filters need.
+
+    `seasons` and `venues` take one value or a list; `date_from`/`date_to`
+    are ISO dates. Rows are filtered exactly after the partitions are pruned
+    and come back in the cleaned files' order: matches by date then id, each
+    match's deliveries in their original order.
+
+    Returns: (matches_df, deliveries_df)
+    """
+    filters = dict(seasons=seasons, venues=venues, date_from=date_from, date_to=date_to)
+    matches = _read_parts(root, "matches", plan(root, "matches", **filters))
+    if seasons is not None:
+        wanted = [str(s) for s in ([seasons] if isinstance(seasons, (str, int)) else seasons)]
+        matches = matches[matches["season"].astype(str).isin(wanted)]
+    if venues is not None:
+        matches = matches[matches["venue"].isin([venues] if isinstance(venues, str) else venues)]
+    if date_from is not None:
+        matches = matches[matches["date"].astype(str) >= date_from]
+    if date_to is not None:
+        matches = matches[matches["date"].astype(str) <= date_to]
+    matches = matches.sort_values(["date", "id"], kind="stable").reset_index(drop=True)
+
+    deliveries = _read_parts(root, "deliveries", plan(root, "deliveries", **filters))
+    position = pd.Series(range(len(matches)), index=matches["id"].to_numpy())
+    match_position = position.reindex(deliveries["match_id"].to_numpy()).to_numpy()
+    keep = ~pd.isna(match_position)
+    order = np.argsort(match_position[keep], kind="stable")
+    deliveries = deliveries[keep].iloc[order].reset_index(drop=True)
+    if categorical:
+        deliveries = compact_dtypes(deliveries)
+    return matches, deliveries
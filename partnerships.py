@@ -0,0 +1,128 @@
+"""Batting partnerships from the ball-by-ball data.
+
+Deliveries are sorted by match, inning, over and ball, and a new
+partnership starts at the first ball of every innings and after every
+wicket. Cumulative sums over those start flags number the partnerships,
+and every per-partnership figure is a bincount over that number, so the
+whole history is split in a handful of array operations with no loop over
+innings:
+
+    parts = partnerships(deliveries)   # one row per partnership
+    best_pairs(parts)                  # pairs ranked by partnership runs
+    by_wicket(parts)                   # 1st-wicket, 2nd-wicket, ... breakdown
+
+As elsewhere in the stats, `balls` counts every delivery, wides included.
+A pair is named in alphabetical order, so A-B and B-A are the same pair.
+"""
+import numpy as np
+import pandas as pd
+
+
+COLUMNS = ["match_id", "inning", "batting_team", "wicket", "batter_1", "batter_2", "runs", "balls", "run_rate",
+           "batter_1_runs", "batter_2_runs", "extras", "start_score", "end_score", "start_ball", "end_ball",
+           "unbroken", "dismissed", "dismissal_kind"]
+# Column dtypes, the same whether the table is split from deliveries or read back from the aggregate store
+DTYPES = {**{c: "int64" for c in ["match_id", "inning", "wicket", "runs", "balls", "batter_1_runs", "batter_2_runs",
+                                  "extras", "start_score", "end_score"]},
+          **{c: "str" for c in ["batting_team", "batter_1", "batter_2", "start_ball", "end_ball", "dismissed",
+                                "dismissal_kind"]},
+          "run_rate": "float64", "unbroken": "bool"}
+
+
+def _ball_label(over: np.ndarray, ball: np.ndarray) -> np.ndarray:
+    return (pd.Series(over).astype(str) + "." + pd.Series(ball).astype(str)).to_numpy()
+
+
+def partnerships(deliveries: pd.DataFrame) -> pd.DataFrame:
+    """One row per partnership, in match, inning and wicket order.
+
+    `wicket` is the partnership's number within its innings (1 for the
+    opening stand); `unbroken` marks those not ended by a dismissal.
+    """
+    if deliveries.empty:
+        return pd.DataFrame(columns=COLUMNS).astype(DTYPES)
+    order = np.lexsort([deliveries[c].to_numpy() for c in ("ball", "over", "inning", "match_id")])
+    d = deliveries.iloc[order]
+    n = len(d)
+    match = d["match_id"].to_numpy()
+    inning = d["inning"].to_numpy()
+    total = d["total_runs"].to_numpy().astype(np.int64)
+    wicket = d["is_wicket"].to_numpy() == 1
+
+    innings_start = np.r_[True, (match[1:] != match[:-1]) | (inning[1:] != inning[:-1])]
+    starts = innings_start | np.r_[False, wicket[:-1]]
+    part = np.cumsum(starts) - 1
+    first = np.flatnonzero(starts)
+    last = np.r_[first[1:], n] - 1
+    innings = np.cumsum(innings_start) - 1
+    innings_first_part = part[np.flatnonzero(innings_start)]
+
+    # Players as codes in name order, so a pair's lower code is its alphabetically first batter
+    codes, players = pd.factorize(np.concatenate([d["batter"].to_numpy(), d["non_striker"].to_numpy()]), sort=True)
+    batter, non_striker = codes[:n], codes[n:]
+    batter_1 = np.minimum(batter[first], non_striker[first])
+    batter_2 = np.maximum(batter[first], non_striker[first])
+    batsman_runs = d["batsman_runs"].to_numpy().astype(np.int64)
+    count = len(first)
+    on_strike_1 = batter == batter_1[part]
+    on_strike_2 = batter == batter_2[part]
+
+    runs = np.bincount(part, weights=total, minlength=count).astype(np.int64)
+    # Innings score before each ball: running total less the total at the innings' first ball
+    before = np.cumsum(total) - total
+    start_score = (before - before[np.flatnonzero(innings_start)][innings])[first]
+    balls = last - first + 1
+    over, ball = d["over"].to_numpy(), d["ball"].to_numpy()
+    ended = wicket[last]
+
+    return pd.DataFrame({
+        "match_id": match[first],
+        "inning": inning[first],
+        "batting_team": d["batting_team"].to_numpy()[first],
+        "wicket": part[first] - innings_first_part[innings[first]] + 1,
+        "batter_1": players[batter_1],
+        "batter_2": players[batter_2],
+        "runs": runs,
+        "balls": balls,
+        "run_rate": (runs / (balls / 6)).round(2),
+        "batter_1_runs": np.bincount(part, weights=batsman_runs * on_strike_1, minlength=count).astype(np.int64),
+        "batter_2_runs": np.bincount(part, weights=batsman_runs * on_strike_2, minlength=count).astype(np.int64),
+        "extras": np.bincount(part, weights=d["extra_runs"].to_numpy(), minlength=count).astype(np.int64),
+        "start_score": start_score,
+        "end_score": start_score + runs,
+        "start_ball": _ball_label(over[first], ball[first]),
+        "end_ball": _ball_label(over[last], ball[last]),
+        "unbroken": ~ended,
+        "dismissed": np.where(ended, d["player_dismissed"].to_numpy(dtype=object)[last], None),
+        "dismissal_kind": np.where(ended, d["dismissal_kind"].to_numpy(dtype=object)[last], None),
+    }, columns=COLUMNS).astype(DTYPES)
+
+
+def _summarise(parts: pd.DataFrame, keys: list) -> pd.DataFrame:
+    flags = parts[keys + ["runs", "balls"]].assign(
+        partnerships=1,
+        fifties=((parts["runs"] >= 50) & (parts["runs"] < 100)).astype(np.int64),
+        hundreds=(parts["runs"] >= 100).astype(np.int64),
+        dismissals=(~parts["unbroken"].astype(bool)).astype(np.int64),
+    )
+    grouped = flags.groupby(keys, sort=True, observed=True)
+    summary = grouped[["partnerships", "runs", "balls"]].sum()
+    summary["highest"] = grouped["runs"].max()
+    summary[["fifties", "hundreds"]] = grouped[["fifties", "hundreds"]].sum()
+    summary["run_rate"] = (summary["runs"] / (summary["balls"] / 6)).round(2)
+    # Average: runs per partnership ended by a wicket, as for a batting average
+    summary["average"] = (summary["runs"] / grouped["dismissals"].sum().replace(0, np.nan)).round(2)
+    return summary
+
+
+def best_pairs(parts: pd.DataFrame, min_partnerships: int = 1) -> pd.DataFrame:
+    """Totals per pair of batters, most partnership runs first."""
+    pairs = _summarise(parts, ["batter_1", "batter_2"])
+    pairs = pairs[pairs["partnerships"] >= min_partnerships]
+    return pairs.sort_values(["runs", "partnerships"], ascending=False, kind="stable")
+
+
+def by_wicket(parts: pd.DataFrame, by=None) -> pd.DataFrame:
+    """Totals per wicket number (1st-wicket stands, 2nd-wicket stands, ...), optionally split by `by`."""
+    by = [by] if isinstance(by, str) else list(by or [])
+    return _summarise(parts, by + ["wicket"])
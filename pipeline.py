@@ -0,0 +1,308 @@
+"""Dependency-driven runner for the EDA figures and CSV reports.
+
+Every table, report and figure is a named task that declares the tasks it
+needs. `run` works out the tasks a set of requested outputs depends on and
+executes only those, each once, so refreshing one report does not load the
+deliveries, compute unrelated sections or import the plotting libraries:
+
+    python pipeline.py venue_statistics.csv
+    python pipeline.py top_batsmen_analysis.png team_wins_overall.csv
+    python pipeline.py --list
+
+With no targets every report and figure is built. Reports and figures go
+through the same content-hash cache as `generate_reports.py` and `EDA.py`,
+so an output whose inputs are unchanged is reused.
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+import partnerships as partnership_engine
+import player_form
+import render_cache
+import stats_engine
+from aggregate_store import delivery_partials
+from data_store import read_table
+from instrumentation import Trace
+from win_rate_ci import winning_factor_intervals
+
+
+# task name -> (function, names of the tasks whose results it takes)
+TASKS = {}
+
+
+def task(*inputs, name: str = None):
+    """Register a task; it is called with the results of `inputs`, in order."""
+    def register(fn):
+        TASKS[name or fn.__name__] = (fn, inputs)
+        return fn
+    return register
+
+
+# ==================== DATA ====================
+# `config` is not a task: it is the run's settings, seeded by `run`
+
+@task("config")
+def matches(config):
+    return read_table(os.path.join(config["folder"], "matches_cleaned.csv"), categorical=False)
+
+
+@task("config")
+def deliveries(config):
+    return stats_engine.load_cleaned(config["folder"])[1]
+
+
+@task("deliveries", "matches")
+def delivery_aggregates(deliveries, matches):
+    return stats_engine.delivery_aggregates(deliveries, matches)
+
+
+@task("delivery_aggregates")
+def batsmen(aggregates):
+    return aggregates["batsmen"]
+
+
+@task("delivery_aggregates")
+def bowlers(aggregates):
+    return aggregates["bowlers"]
+
+
+@task("deliveries", "matches")
+def player_forms(deliveries, matches):
+    return player_form.form_tables(delivery_partials(deliveries), matches)
+
+
+@task("deliveries")
+def partnerships(deliveries):
+    return partnership_engine.partnerships(deliveries)
+
+
+@task("matches")
+def rivalries(matches):
+    return stats_engine.head_to_head(matches)
+
+
+@task("matches")
+def team_wins(matches):
+    return stats_engine.team_wins(matches)
+
+
+@task("matches")
+def venues(matches):
+    return stats_engine.venue_stats(matches)
+
+
+@task("matches")
+def seasons(matches):
+    return stats_engine.season_stats(matches)
+
+
+@task("matches")
+def toss_decisions(matches):
+    return stats_engine.toss_decision_stats(matches)
+
+
+@task("matches")
+def winning_factors(matches):
+    return stats_engine.winning_factor_inputs(matches)
+
+
+# ==================== REPORTS ====================
+
+def _save_report(config, df, path, **to_csv_kwargs):
+    path = os.path.join(config["out_dir"], path)
+    if config["use_cache"]:
+        if not render_cache.save_csv(df, path, **to_csv_kwargs):
+            config["reused"].append(path)
+    else:
+        df.to_csv(path, **to_csv_kwargs)
+        render_cache.record(path, render_cache.fingerprint(df, to_csv_kwargs))
+    return path
+
+
+@task("config", "batsmen", name="batsmen_detailed_stats.csv")
+def batsmen_report(config, batsmen):
+    return _save_report(config, batsmen.sort_values('runs', ascending=False), 'batsmen_detailed_stats.csv')
+
+
+@task("config", "bowlers", name="bowlers_detailed_stats.csv")
+def bowlers_report(config, bowlers):
+    return _save_report(config, bowlers.sort_values('wickets', ascending=False), 'bowlers_detailed_stats.csv')
+
+
+@task("config", "player_forms", name="batsmen_form.csv")
+def batsmen_form_report(config, forms):
+    return _save_report(config, forms["batsmen_form"].sort_values('ewm_runs', ascending=False, kind='stable'),
+                        'batsmen_form.csv')
+
+
+@task("config", "player_forms", name="bowlers_form.csv")
+def bowlers_form_report(config, forms):
+    return _save_report(config, forms["bowlers_form"].sort_values('ewm_wickets', ascending=False, kind='stable'),
+                        'bowlers_form.csv')
+
+
+@task("config", "partnerships", name="partnership_pairs.csv")
+def partnership_pairs_report(config, partnerships):
+    return _save_report(config, partnership_engine.best_pairs(partnerships), 'partnership_pairs.csv')
+
+
+@task("config", "partnerships", name="partnerships_by_wicket.csv")
+def partnerships_by_wicket_report(config, partnerships):
+    return _save_report(config, partnership_engine.by_wicket(partnerships), 'partnerships_by_wicket.csv')
+
+
+@task("config", "rivalries", name="team_rivalries_h2h.csv")
+def rivalries_report(config, rivalries):
+    return _save_report(config, rivalries, 'team_rivalries_h2h.csv', index=False)
+
+
+@task("config", "team_wins", name="team_wins_overall.csv")
+def team_wins_report(config, team_wins):
+    team_wins_df = pd.DataFrame({'Team': team_wins.index, 'Total_Wins': team_wins.values})
+    return _save_report(config, team_wins_df, 'team_wins_overall.csv', index=False)
+
+
+@task("config", "toss_decisions", name="toss_decision_impact.csv")
+def toss_report(config, toss_decisions):
+    return _save_report(config, toss_decisions, 'toss_decision_impact.csv', index=False)
+
+
+@task("config", "matches", name="winning_factors_ci.csv")
+def winning_factors_ci_report(config, matches):
+    intervals = winning_factor_intervals(matches, workers=config["workers"])
+    return _save_report(config, intervals, 'winning_factors_ci.csv', index=False)
+
+
+@task("config", "venues", name="venue_statistics.csv")
+def venues_report(config, venues):
+    return _save_report(config, venues, 'venue_statistics.csv')
+
+
+@task("config", "seasons", name="season_statistics.csv")
+def seasons_report(config, seasons):
+    return _save_report(config, seasons, 'season_statistics.csv')
+
+
+# ==================== FIGURES ====================
+# charts (matplotlib and seaborn) is imported only when a figure is built
+
+def _render(config, render_name, path, **kwargs):
+    import charts
+
+    path = os.path.join(config["out_dir"], path)
+    _, reused = charts.render_all([(getattr(charts, render_name), {**kwargs, 'path': path})], workers=1,
+                                  use_cache=config["use_cache"], trace=config["trace"])
+    config["reused"].extend(reused)
+    return path
+
+
+@task("config", "batsmen", name="top_batsmen_analysis.png")
+def batsmen_figure(config, batsmen):
+    return _render(config, 'render_batsmen', 'top_batsmen_analysis.png',
+                   batsmen_stats_filtered=stats_engine.qualified_batsmen(batsmen))
+
+
+@task("config", "bowlers", name="top_bowlers_analysis.png")
+def bowlers_figure(config, bowlers):
+    return _render(config, 'render_bowlers', 'top_bowlers_analysis.png',
+                   bowlers_stats_filtered=stats_engine.qualified_bowlers(bowlers))
+
+
+@task("config", "rivalries", "team_wins", name="team_rivalries_analysis.png")
+def rivalries_figure(config, rivalries, team_wins):
+    return _render(config, 'render_rivalries', 'team_rivalries_analysis.png', h2h_df=rivalries, team_wins=team_wins)
+
+
+@task("config", "winning_factors", name="winning_factors_analysis.png")
+def winning_factors_figure(config, winning_factors):
+    return _render(config, 'render_winning_factors', 'winning_factors_analysis.png', **winning_factors)
+
+
+OUTPUTS = [name for name in TASKS if "." in name]
+
+
+# ==================== RUNNER ====================
+
+def plan(targets) -> list:
+    """Names of the tasks needed for `targets`, each after the tasks it depends on.
+
+    Raises ValueError for an unknown target.
+    """
+    order, seen = [], set()
+
+    def visit(name, path=()):
+        if name == "config" or name in seen:
+            return
+        if name not in TASKS:
+            raise ValueError(f"unknown target {name!r}; run with --list to see the available outputs")
+        if name in path:
+            raise ValueError(f"task dependency cycle: {' -> '.join(path + (name,))}")
+        for dependency in TASKS[name][1]:
+            visit(dependency, path + (name,))
+        seen.add(name)
+        order.append(name)
+
+    for target in targets:
+        visit(target)
+    return order
+
+
+def run(targets=None, folder: str = None, out_dir: str = None, use_cache: bool = True, trace: Trace = None,
+        workers: int = 1, reused: list = None) -> dict:
+    """Build `targets` (default: every report and figure), running only the tasks they need.
+
+    `workers` processes run the winning-factor resampling. The paths of
+    outputs left in place because their inputs are unchanged are appended
+    to `reused`.
+
+    Returns: dict of task name -> result (output paths for reports and figures).
+    """
+    trace = trace or Trace()
+    folder = folder or os.getcwd()
+    results = {"config": {"folder": folder, "out_dir": out_dir or folder, "use_cache": use_cache, "trace": trace,
+                          "workers": workers, "reused": reused if reused is not None else []}}
+    for name in plan(targets or OUTPUTS):
+        fn, inputs = TASKS[name]
+        with trace.stage(name) as stage:
+            results[name] = fn(*[results[i] for i in inputs])
+            if hasattr(results[name], "__len__") and not isinstance(results[name], (str, dict)):
+                stage["rows"] = len(results[name])
+    del results["config"]
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build selected IPL reports and figures")
+    parser.add_argument('targets', nargs='*', help="outputs to build (default: all)")
+    parser.add_argument('--list', action='store_true', help="list the available outputs and exit")
+    parser.add_argument('--folder', default=None, help="folder with the cleaned data (default: current directory)")
+    parser.add_argument('--out-dir', default=None, help="where outputs are written (default: --folder)")
+    parser.add_argument('--no-cache', action='store_true', help="rebuild outputs even if their inputs are unchanged")
+    parser.add_argument('--trace', nargs='?', const='pipeline_trace.json', default=None, metavar='PATH',
+                        help="write per-task timings to PATH (.json or .csv); IPL_TRACE=PATH does the same")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes used for the winning-factor resampling (default: 1)")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(OUTPUTS))
+        sys.exit(0)
+    targets = args.targets or OUTPUTS
+    try:
+        plan(targets)
+    except ValueError as exc:
+        parser.error(str(exc))
+    trace = Trace.from_env(args.trace)
+    reused = []
+    results = run(targets, args.folder, args.out_dir, use_cache=not args.no_cache, trace=trace,
+                  workers=args.workers, reused=reused)
+    for target in targets:
+        if results[target] in reused:
+            print(f"↺ Reused (inputs unchanged): {results[target]}")
+        else:
+            print(f"✓ Saved: {results[target]}")
+    if trace.write():
+        print(f"✓ Saved stage trace: {trace.path}")
@@ -0,0 +1,185 @@
+"""Recency-weighted batter and bowler form.
+
+Form is measured over each player's innings in match order (match date,
+then id), an innings being the player's sums for one match:
+
+- rolling: sums over the last `WINDOW` innings, with the strike rate or
+  economy derived from them
+- decayed: exponentially weighted means per innings with a half-life of
+  `HALFLIFE` innings, so an innings `HALFLIFE` games back counts half as
+  much as the latest one
+
+Both are computed for every player at once with grouped window operations
+over the innings table. Extending them only needs each player's last
+`WINDOW` innings and their decayed sums, so new matches are folded in
+without revisiting the history:
+
+    state, history = advance("batsmen", empty_state("batsmen"), innings)  # from scratch
+    state, rows = advance("batsmen", state, new_innings)                  # new matches
+    latest = current_form("batsmen", state)
+
+`history` has one row per innings: the player's form after that game.
+Matches are expected to arrive in date order; one older than the matches
+already folded in is counted as the player's latest innings.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+
+WINDOW = 10
+HALFLIFE = 5
+DECAY = 0.5 ** (1 / HALFLIFE)
+
+# table -> (player column, per-innings sums)
+FORM_TABLES = {
+    "batsmen": ("batter", ["runs", "balls_faced"]),
+    "bowlers": ("bowler", ["wickets", "balls_bowled", "runs_conceded"]),
+}
+
+
+def _rates(name: str, sums: pd.DataFrame) -> dict:
+    if name == "batsmen":
+        return {"strike_rate": (sums["runs"] / sums["balls_faced"] * 100).round(2)}
+    return {"economy_rate": (sums["runs_conceded"] / (sums["balls_bowled"] / 6)).round(2)}
+
+
+def _form_columns(name: str, window: pd.DataFrame, decayed: pd.DataFrame) -> pd.DataFrame:
+    """Form columns from the window sums and the decayed per-innings means."""
+    columns = {f"form_{c}": window[c] for c in window.columns}
+    columns.update({f"form_{c}": v for c, v in _rates(name, window).items()})
+    columns.update({f"ewm_{c}": decayed[c].round(2) for c in decayed.columns})
+    columns.update({f"ewm_{c}": v for c, v in _rates(name, decayed).items()})
+    return pd.DataFrame(columns)
+
+
+def innings(name: str, partials: pd.DataFrame, matches: pd.DataFrame) -> pd.DataFrame:
+    """Innings rows in match order per player, from per-(player, match_id) partials.
+
+    `partials` is shaped like `aggregate_store.delivery_partials(...)[name]`.
+    """
+    entity, measures = FORM_TABLES[name]
+    dates = matches.set_index("id")["date"]
+    frame = partials[measures].reset_index()
+    frame[entity] = frame[entity].astype(object)
+    frame.insert(1, "date", dates.reindex(frame["match_id"]).to_numpy())
+    return frame.sort_values([entity, "date", "match_id"], kind="stable", ignore_index=True)
+
+
+def empty_state(name: str) -> tuple:
+    """State before any match: (last `WINDOW` innings per player, decayed sums per player)."""
+    entity, measures = FORM_TABLES[name]
+    tail = pd.DataFrame(columns=[entity, "date", "match_id", *measures])
+    decayed = pd.DataFrame(columns=["innings", "weight", *measures], index=pd.Index([], name=entity), dtype=float)
+    return tail, decayed
+
+
+def advance(name: str, state: tuple, new: pd.DataFrame) -> tuple:
+    """Fold new innings (from `innings`) into the state.
+
+    Returns: (new state, form after each new innings)
+    """
+    entity, measures = FORM_TABLES[name]
+    tail, decayed = state
+    # The carried tail goes ahead of the new innings; a stable sort keeps that order per player
+    frame = pd.concat([tail.assign(new=False), new.assign(new=True)], ignore_index=True)
+    frame = frame.sort_values(entity, kind="stable", ignore_index=True)
+    frame[measures] = frame[measures].astype("int64")
+
+    # Rolling sums over the last WINDOW innings: cumulative sums less the sums WINDOW innings back
+    grouped = frame.groupby(entity, sort=False)
+    running = grouped[measures].cumsum()
+    window = running - running.groupby(frame[entity], sort=False).shift(WINDOW, fill_value=0)
+
+    rows = frame[frame["new"]]
+    window = window[frame["new"]]
+    by_player = rows.groupby(entity, sort=False)
+    # Decayed sums: the new innings' own weighted mean times its total weight,
+    # plus the carried sums decayed once per new innings
+    count = by_player.cumcount().to_numpy() + 1
+    carried = DECAY ** count
+    batch_weight = (1 - carried) / (1 - DECAY)
+    batch_mean = by_player[measures].ewm(halflife=HALFLIFE).mean().droplevel(0).reindex(rows.index)
+    prior = decayed.reindex(rows[entity]).fillna(0).to_numpy()
+    weight = carried * prior[:, 1] + batch_weight
+    sums = carried[:, None] * prior[:, 2:] + batch_mean.to_numpy() * batch_weight[:, None]
+
+    history = pd.concat([
+        rows[[entity, "date", "match_id"]].assign(innings=(prior[:, 0] + count).astype("int64")),
+        _form_columns(name, window, pd.DataFrame(sums / weight[:, None], columns=measures, index=rows.index)),
+    ], axis=1)
+
+    updated = pd.DataFrame(np.column_stack([prior[:, 0] + count, weight, sums]), index=rows[entity],
+                           columns=decayed.columns).loc[lambda d: ~d.index.duplicated(keep="last")]
+    decayed = pd.concat([decayed.drop(updated.index, errors="ignore"), updated.rename_axis(entity)])
+    tail = frame.groupby(entity, sort=False).tail(WINDOW)[tail.columns].reset_index(drop=True)
+    return (tail, decayed), history.reset_index(drop=True)
+
+
+def current_form(name: str, state: tuple) -> pd.DataFrame:
+    """Latest form of every player in the state, one row per player."""
+    entity, measures = FORM_TABLES[name]
+    tail, decayed = state
+    if decayed.empty:
+        return pd.DataFrame(columns=["innings", "last_match_date"]).rename_axis(entity)
+    recent = tail.astype({c: "int64" for c in measures}).groupby(entity, sort=True)
+    window = recent[measures].sum()
+    decayed = decayed.sort_index()
+    means = decayed[measures].div(decayed["weight"], axis=0)
+    form = pd.concat([
+        pd.DataFrame({"innings": decayed["innings"].astype("int64"), "last_match_date": recent["date"].max()}),
+        _form_columns(name, window, means),
+    ], axis=1)
+    return form.rename_axis(entity)
+
+
+def form_tables(partials: dict, matches: pd.DataFrame) -> dict:
+    """Latest batter and bowler form from scratch, keyed `batsmen_form` / `bowlers_form`."""
+    tables = {}
+    for name in FORM_TABLES:
+        state, _ = advance(name, empty_state(name), innings(name, partials[name], matches))
+        tables[f"{name}_form"] = current_form(name, state)
+    return tables
+
+
+# ==================== STORE ====================
+# Kept next to the aggregate store's partials: `<table>_form_tail.csv`,
+# `<table>_form_decayed.csv` and the latest form, `<table>_form.csv`
+
+def _path(store_dir: str, name: str, kind: str) -> str:
+    return os.path.join(store_dir, f"{name}_{kind}.csv")
+
+
+def has_state(store_dir: str) -> bool:
+    return all(os.path.exists(_path(store_dir, name, "form_decayed")) for name in FORM_TABLES)
+
+
+def load_state(name: str, store_dir: str) -> tuple:
+    entity, _ = FORM_TABLES[name]
+    if not os.path.exists(_path(store_dir, name, "form_decayed")):
+        return empty_state(name)
+    tail = pd.read_csv(_path(store_dir, name, "form_tail"), dtype={entity: object, "date": str})
+    decayed = pd.read_csv(_path(store_dir, name, "form_decayed"), index_col=entity, dtype={entity: object})
+    return tail, decayed
+
+
+def update_store(partials: dict, matches: pd.DataFrame, store_dir: str, reset: bool = False) -> dict:
+    """Fold the partials of new matches into the stored form state; `reset` starts it over.
+
+    Returns: the latest form tables, as `load_form`.
+    """
+    tables = {}
+    for name in FORM_TABLES:
+        state = empty_state(name) if reset else load_state(name, store_dir)
+        state, _ = advance(name, state, innings(name, partials[name], matches))
+        tail, decayed = state
+        tail.to_csv(_path(store_dir, name, "form_tail"), index=False)
+        decayed.to_csv(_path(store_dir, name, "form_decayed"))
+        tables[f"{name}_form"] = current_form(name, state)
+        tables[f"{name}_form"].to_csv(_path(store_dir, name, "form"))
+    return tables
+
+
+def load_form(store_dir: str) -> dict:
+    """Latest stored form tables; missing ones come back empty."""
+    return {f"{name}_form": current_form(name, load_state(name, store_dir)) for name in FORM_TABLES}
@@ -0,0 +1,173 @@
+"""Importable query API over the cleaned IPL data.
+
+`StatsIndex` loads the cleaned tables once and builds, for each of batter,
+bowler, batting team, venue and season, a permutation of the delivery rows
+grouped by that key plus an offsets array. A lookup is then a slice of the
+permutation and a few NumPy reductions over those rows, with no
+whole-frame boolean masks.
+
+    from query_api import load
+    idx = load()
+    idx.batting_summary("V Kohli")
+    idx.bowler_spells("JJ Bumrah")
+    idx.team_vs_team("Mumbai Indians", "Chennai Super Kings")
+"""
+import numpy as np
+import pandas as pd
+
+from stats_engine import load_cleaned
+
+
+class _KeyIndex:
+    """Delivery rows grouped by one key: rows of key k are order[offsets[k]:offsets[k + 1]]."""
+
+    def __init__(self, values):
+        codes, names = pd.factorize(values)
+        valid = codes >= 0
+        self.codes = {name: i for i, name in enumerate(names)}
+        self.order = np.flatnonzero(valid)[np.argsort(codes[valid], kind="stable")]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[valid], minlength=len(names)))])
+
+    def rows(self, key) -> np.ndarray:
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes.get(str(key))
+        if code is None:
+            raise KeyError(key)
+        return self.order[self.offsets[code]:self.offsets[code + 1]]
+
+    def keys(self) -> list:
+        return list(self.codes)
+
+
+class StatsIndex:
+    """Indexed, read-only view of the cleaned deliveries and matches."""
+
+    def __init__(self, deliveries: pd.DataFrame, matches: pd.DataFrame):
+        match_row = pd.Series(np.arange(len(matches)), index=matches["id"].to_numpy())
+        ball_match = match_row.reindex(deliveries["match_id"].to_numpy()).to_numpy()
+        has_match = ~np.isnan(ball_match)
+        ball_match = np.where(has_match, ball_match, 0).astype(np.int64)
+
+        self.match_id = deliveries["match_id"].to_numpy()
+        self.batsman_runs = deliveries["batsman_runs"].to_numpy(dtype=np.int64)
+        self.total_runs = deliveries["total_runs"].to_numpy(dtype=np.int64)
+        self.is_wicket = (deliveries["is_wicket"] == 1).to_numpy()
+        self.winner = matches["winner"].to_numpy(dtype=object)
+
+        season = matches["season"].astype(str).to_numpy(dtype=object)[ball_match]
+        venue = matches["venue"].to_numpy(dtype=object)[ball_match]
+        self.ball_season = np.where(has_match, season, None)
+
+        self.by_batter = _KeyIndex(deliveries["batter"].to_numpy(dtype=object))
+        self.by_bowler = _KeyIndex(deliveries["bowler"].to_numpy(dtype=object))
+        self.by_team = _KeyIndex(deliveries["batting_team"].to_numpy(dtype=object))
+        self.by_venue = _KeyIndex(np.where(has_match, venue, None))
+        self.by_season = _KeyIndex(self.ball_season)
+
+        team1 = matches["team1"].to_numpy(dtype=object)
+        team2 = matches["team2"].to_numpy(dtype=object)
+        swap = team1 > team2
+        self.by_pair = _KeyIndex(pd.Series(list(zip(np.where(swap, team2, team1), np.where(swap, team1, team2)))))
+
+    def _rows(self, index: _KeyIndex, key, season=None) -> np.ndarray:
+        rows = index.rows(key)
+        if season is not None:
+            rows = rows[self.ball_season[rows] == str(season)]
+        return rows
+
+    def _scoring(self, rows: np.ndarray) -> dict:
+        runs = int(self.total_runs[rows].sum())
+        balls = len(rows)
+        return {
+            "runs": runs,
+            "balls": balls,
+            "wickets": int(self.is_wicket[rows].sum()),
+            "matches": len(np.unique(self.match_id[rows])),
+            "run_rate": round(runs / (balls / 6), 2) if balls else None,
+        }
+
+    def batting_summary(self, player: str, season=None) -> dict:
+        """Career (or single-season) batting numbers for `player`."""
+        rows = self._rows(self.by_batter, player, season)
+        runs = self.batsman_runs[rows]
+        balls = len(rows)
+        total = int(runs.sum())
+        return {
+            "batter": player,
+            "runs": total,
+            "balls_faced": balls,
+            "fours": int((runs == 4).sum()),
+            "sixes": int((runs == 6).sum()),
+            "innings": len(np.unique(self.match_id[rows])),
+            "strike_rate": round(total / balls * 100, 2) if balls else None,
+        }
+
+    def bowling_summary(self, player: str, season=None) -> dict:
+        """Career (or single-season) bowling numbers for `player`."""
+        rows = self._rows(self.by_bowler, player, season)
+        conceded = self.total_runs[rows]
+        balls = len(rows)
+        runs = int(conceded.sum())
+        return {
+            "bowler": player,
+            "wickets": int(self.is_wicket[rows].sum()),
+            "balls_bowled": balls,
+            "runs_conceded": runs,
+            "dot_balls": int((conceded == 0).sum()),
+            "economy_rate": round(runs / (balls / 6), 2) if balls else None,
+        }
+
+    def bowler_spells(self, player: str, season=None) -> pd.DataFrame:
+        """One row per match bowled in: match_id, season, balls, runs_conceded, wickets."""
+        rows = self._rows(self.by_bowler, player, season)
+        match_ids, first, spell = np.unique(self.match_id[rows], return_index=True, return_inverse=True)
+        n = len(match_ids)
+        return pd.DataFrame({
+            "match_id": match_ids,
+            "season": self.ball_season[rows][first],
+            "balls": np.bincount(spell, minlength=n),
+            "runs_conceded": np.bincount(spell, weights=self.total_runs[rows], minlength=n).astype(np.int64),
+            "wickets": np.bincount(spell, weights=self.is_wicket[rows], minlength=n).astype(np.int64),
+        })
+
+    def team_batting(self, team: str, season=None) -> dict:
+        """Runs, balls, wickets lost and run rate for `team` batting."""
+        return {"team": team, **self._scoring(self._rows(self.by_team, team, season))}
+
+    def venue_summary(self, venue: str, season=None) -> dict:
+        """Scoring at `venue`."""
+        return {"venue": venue, **self._scoring(self._rows(self.by_venue, venue, season))}
+
+    def season_summary(self, season) -> dict:
+        """Scoring across a whole season."""
+        return {"season": str(season), **self._scoring(self.by_season.rows(str(season)))}
+
+    def team_vs_team(self, team_a: str, team_b: str) -> dict:
+        """Head-to-head record between two teams, from the matches table."""
+        key = tuple(sorted([team_a, team_b]))
+        try:
+            rows = self.by_pair.rows(key)
+        except KeyError:
+            rows = np.array([], dtype=np.int64)
+        winners = self.winner[rows]
+        a_wins = int((winners == team_a).sum())
+        b_wins = int((winners == team_b).sum())
+        return {
+            "team_a": team_a,
+            "team_b": team_b,
+            "a_wins": a_wins,
+            "b_wins": b_wins,
+            "no_result": len(rows) - a_wins - b_wins,
+            "total": len(rows),
+        }
+
+    def players(self) -> dict:
+        """Names known to the index: {'batters': [...], 'bowlers': [...]}."""
+        return {"batters": self.by_batter.keys(), "bowlers": self.by_bowler.keys()}
+
+
+def load(folder: str = None) -> StatsIndex:
+    """Load the cleaned data from `folder` and index it."""
+    matches, deliveries = load_cleaned(folder)
+    return StatsIndex(deliveries, matches)
@@ -0,0 +1,102 @@
+"""Content-hash cache for rendered figures and report CSVs.
+
+Every output is keyed by a hash of the aggregates it is built from plus its
+plotting/report parameters. Keys are kept in a `.render_cache.json`
+manifest next to the outputs; an output whose file exists and whose key is
+unchanged is reused instead of regenerated.
+"""
+import hashlib
+import json
+import os
+import types
+import numpy as np
+import pandas as pd
+
+
+MANIFEST_NAME = ".render_cache.json"
+
+
+def _update(h, obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(repr((type(obj).__name__, obj.shape, obj.index.names,
+                       list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(obj.tobytes())
+    elif isinstance(obj, dict):
+        for key in sorted(obj):
+            h.update(repr(key).encode())
+            _update(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            _update(h, item)
+    elif callable(obj) and hasattr(obj, "__code__"):
+        # Functions are keyed by their bytecode so editing a chart invalidates it
+        h.update(f"{obj.__module__}.{obj.__qualname__}".encode())
+        _update(h, obj.__code__)
+    elif isinstance(obj, types.CodeType):
+        # Names too: `ax.barh` -> `ax.bar` or a swapped palette global only changes co_names
+        h.update(obj.co_code)
+        h.update(repr((obj.co_names, obj.co_varnames)).encode())
+        for const in obj.co_consts:
+            _update(h, const)
+    else:
+        h.update(repr(obj).encode())
+
+
+def fingerprint(*objs) -> str:
+    """Stable content hash of DataFrames, Series, arrays, functions and plain values."""
+    h = hashlib.sha256()
+    for obj in objs:
+        _update(h, obj)
+    return h.hexdigest()
+
+
+def _manifest_path(path: str) -> str:
+    return os.path.join(os.path.dirname(path) or ".", MANIFEST_NAME)
+
+
+def _load_manifest(path: str) -> dict:
+    manifest = _manifest_path(path)
+    if not os.path.exists(manifest):
+        return {}
+    with open(manifest) as f:
+        return json.load(f)
+
+
+def is_fresh(path: str, key: str) -> bool:
+    """True when `path` exists and was last written with the same key."""
+    return os.path.exists(path) and _load_manifest(path).get(os.path.basename(path)) == key
+
+
+def record(path: str, key: str):
+    """Remember the key `path` was just written with."""
+    entries = _load_manifest(path)
+    entries[os.path.basename(path)] = key
+    with open(_manifest_path(path), "w") as f:
+        json.dump(entries, f, indent=1, sort_keys=True)
+
+
+def record_many(keys: dict):
+    """`record` for many outputs at once, writing each manifest once."""
+    by_manifest = {}
+    for path, key in keys.items():
+        by_manifest.setdefault(_manifest_path(path), {})[os.path.basename(path)] = key
+    for manifest, new_entries in by_manifest.items():
+        entries = _load_manifest(manifest)
+        entries.update(new_entries)
+        with open(manifest, "w") as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+
+
+def save_csv(df, path: str, **to_csv_kwargs) -> bool:
+    """Write `df` to `path` unless an identical table was written there before.
+
+    Returns True when the file was written, False when it was reused.
+    """
+    key = fingerprint(df, to_csv_kwargs)
+    if is_fresh(path, key):
+        return False
+    df.to_csv(path, **to_csv_kwargs)
+    record(path, key)
+    return True
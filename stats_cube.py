@@ -0,0 +1,194 @@
+"""Precomputed season/venue/team/player/inning/over cube of the deliveries.
+
+Two views of the same deliveries are kept, one row per occupied cell:
+
+- `batting`: (season, venue, team = batting team, player = batter, inning, over)
+- `bowling`: (season, venue, team = bowling team, player = bowler, inning, over)
+
+Each cell holds runs (all runs off the delivery), batsman_runs, balls,
+wickets, fours, sixes and dots, and carries the over's phase (powerplay
+overs 1-6, middle 7-15, death 16-20). Every cell sum is additive, so any
+slice or roll-up is a filter and a small groupby over the cube instead of a
+fresh pass over the ball-by-ball table:
+
+    cube = load_cube()
+    cube.rollup("bowling", player="JJ Bumrah", phase="death", season="2023")
+    cube.rollup("batting", by="venue", team="Mumbai Indians", phase="powerplay")
+
+The cube is saved under `cube/` next to the cleaned data and rebuilt when
+the cleaned files are newer.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+from data_store import _has_parquet_engine
+from stats_engine import load_cleaned
+
+
+CUBE_DIR = "cube"
+VIEWS = {"batting": ("batting_team", "batter"), "bowling": ("bowling_team", "bowler")}
+DIMENSIONS = ["season", "venue", "team", "player", "inning", "over"]
+MEASURES = ["runs", "batsman_runs", "balls", "wickets", "fours", "sixes", "dots"]
+PHASES = ["powerplay", "middle", "death"]
+PHASE_STARTS = [6, 15]  # first 0-based over of the middle and death phases
+
+
+def phase_of(over: pd.Series) -> pd.Series:
+    """Phase name of each 0-based over number; overs past the 20th count as death."""
+    labels = np.array(PHASES)
+    return pd.Series(labels[np.searchsorted(PHASE_STARTS, over.to_numpy(), side="right")], index=over.index)
+
+
+def build_view(deliveries: pd.DataFrame, matches: pd.DataFrame, view: str) -> pd.DataFrame:
+    """Sum the deliveries into the cells of one view. Deliveries of unknown matches are left out."""
+    team_column, player_column = VIEWS[view]
+    lookup = matches.set_index("id")[["season", "venue"]]
+    ball_match = lookup.reindex(deliveries["match_id"].to_numpy())
+    columns = {
+        "season": ball_match["season"].astype(str).where(ball_match["season"].notna()).to_numpy(),
+        "venue": ball_match["venue"].to_numpy(),
+        "team": deliveries[team_column].to_numpy(),
+        "player": deliveries[player_column].to_numpy(),
+        "inning": deliveries["inning"].to_numpy(),
+        "over": deliveries["over"].to_numpy(),
+    }
+
+    codes, levels = [], []
+    for dim in DIMENSIONS:
+        c, uniques = pd.factorize(columns[dim], sort=True)
+        codes.append(c)
+        levels.append(uniques)
+    known = np.all([c >= 0 for c in codes], axis=0)
+    cell_key = np.ravel_multi_index([c[known] for c in codes], [len(u) for u in levels])
+    cells, cell = np.unique(cell_key, return_inverse=True)
+
+    batsman_runs = deliveries["batsman_runs"].to_numpy()[known]
+    total_runs = deliveries["total_runs"].to_numpy()[known]
+    flags = {
+        "runs": total_runs,
+        "batsman_runs": batsman_runs,
+        "balls": None,
+        "wickets": (deliveries["is_wicket"] == 1).to_numpy()[known],
+        "fours": batsman_runs == 4,
+        "sixes": batsman_runs == 6,
+        "dots": total_runs == 0,
+    }
+    cube = pd.DataFrame({
+        dim: pd.Categorical.from_codes(idx, categories=uniques) if dim in ("season", "venue", "team", "player")
+        else np.asarray(uniques)[idx]
+        for dim, idx, uniques in zip(DIMENSIONS, np.unravel_index(cells, [len(u) for u in levels]), levels)
+    })
+    cube["phase"] = pd.Categorical(phase_of(cube["over"]), categories=PHASES)
+    for name, weights in flags.items():
+        cube[name] = np.bincount(cell, weights=weights, minlength=len(cells)).astype(np.int64)
+    return cube
+
+
+def _rates(view: str, sums: dict) -> dict:
+    """Derived rates from summed measures; works on scalars and arrays alike."""
+    balls = np.asarray(sums["balls"], dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_ball = lambda x: np.asarray(x, dtype=float) / balls
+        rates = {}
+        if view == "batting":
+            rates["strike_rate"] = per_ball(sums["batsman_runs"]) * 100
+            rates["run_rate"] = per_ball(sums["runs"]) * 6
+        else:
+            rates["economy_rate"] = per_ball(sums["runs"]) * 6
+            wickets = np.asarray(sums["wickets"], dtype=float)
+            rates["balls_per_wicket"] = np.where(wickets > 0, balls / wickets, np.nan)
+        rates["dot_ball_percentage"] = per_ball(sums["dots"]) * 100
+        rates["boundary_percentage"] = per_ball(np.add(sums["fours"], sums["sixes"])) * 100
+    return {name: np.round(value, 2) for name, value in rates.items()}
+
+
+class StatsCube:
+    """Slice and roll-up queries over the batting and bowling views."""
+
+    def __init__(self, views: dict):
+        self.views = views
+
+    def _mask(self, view: str, filters: dict) -> np.ndarray:
+        cube = self.views[view]
+        mask = np.ones(len(cube), dtype=bool)
+        for dim, value in filters.items():
+            if dim not in DIMENSIONS and dim != "phase":
+                raise ValueError(f"unknown dimension {dim!r}; expected one of {DIMENSIONS + ['phase']}")
+            values = [value] if isinstance(value, (str, int)) else list(value)
+            if dim == "season":
+                values = [str(v) for v in values]
+            column = cube[dim]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                # Compare integer codes rather than labels
+                wanted = column.cat.categories.get_indexer(values)
+                mask &= np.isin(column.cat.codes.to_numpy(), wanted[wanted >= 0])
+            else:
+                mask &= np.isin(column.to_numpy(), values)
+        return mask
+
+    def slice(self, view: str, **filters) -> pd.DataFrame:
+        """Cells of `view` matching every filter.
+
+        Filters are dimension names (plus `phase`) with one value or a list;
+        seasons are compared as text.
+        """
+        return self.views[view][self._mask(view, filters)]
+
+    def rollup(self, view: str, by=None, **filters):
+        """Sum the matching cells, grouped by the `by` dimensions, with derived rates.
+
+        Returns a DataFrame indexed by `by`, or a Series when `by` is empty.
+        """
+        by = [by] if isinstance(by, str) else list(by or [])
+        if not by:
+            mask = self._mask(view, filters)
+            cube = self.views[view]
+            sums = {m: int(cube[m].to_numpy()[mask].sum()) for m in MEASURES}
+            return pd.Series({**sums, **{k: float(v) for k, v in _rates(view, sums).items()}})
+        totals = self.slice(view, **filters).groupby(by, observed=True, sort=True)[MEASURES].sum()
+        return totals.assign(**_rates(view, {m: totals[m].to_numpy() for m in MEASURES}))
+
+
+def cube_path(folder: str, view: str) -> str:
+    return os.path.join(folder, CUBE_DIR, f"{view}.parquet" if _has_parquet_engine() else f"{view}.csv")
+
+
+def _is_fresh(folder: str) -> bool:
+    sources = [os.path.join(folder, name) for name in ("deliveries_cleaned.csv", "matches_cleaned.csv")]
+    newest = max((os.path.getmtime(p) for p in sources if os.path.exists(p)), default=0)
+    return all(os.path.exists(cube_path(folder, view)) and os.path.getmtime(cube_path(folder, view)) >= newest
+               for view in VIEWS)
+
+
+def _read_view(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    cube = pd.read_csv(path, dtype={"season": str})
+    for dim in ("season", "venue", "team", "player"):
+        cube[dim] = cube[dim].astype("category")
+    cube["phase"] = pd.Categorical(cube["phase"], categories=PHASES)
+    return cube
+
+
+def build_cube(folder: str = None) -> StatsCube:
+    """Build both views from the cleaned data in `folder` and save them under `cube/`."""
+    folder = folder or os.getcwd()
+    matches, deliveries = load_cleaned(folder)
+    views = {view: build_view(deliveries, matches, view) for view in VIEWS}
+    os.makedirs(os.path.join(folder, CUBE_DIR), exist_ok=True)
+    for view, cube in views.items():
+        path = cube_path(folder, view)
+        if path.endswith(".parquet"):
+            cube.to_parquet(path, index=False)
+        else:
+            cube.to_csv(path, index=False)
+    return StatsCube(views)
+
+
+def load_cube(folder: str = None, rebuild: bool = False) -> StatsCube:
+    """Load the saved cube, rebuilding it first when it is missing or older than the cleaned data."""
+    folder = folder or os.getcwd()
+    if rebuild or not _is_fresh(folder):
+        return build_cube(folder)
+    return StatsCube({view: _read_view(cube_path(folder, view)) for view in VIEWS})
@@ -0,0 +1,357 @@
+"""Shared aggregation engine for the IPL analysis scripts.
+
+EDA.py and generate_reports.py both read their batter, bowler, team and
+venue tables from `compute_aggregates` so the numbers are built once, from a
+single pass over integer-coded ball-by-ball columns, instead of one
+`groupby` scan per statistic.
+
+The ball-by-ball statistics are declared in a metric registry. A new stat
+is one expression over delivery columns and the table it belongs to, and
+then appears in both scripts' tables:
+
+    register_mask("boundary", lambda m: m["four"] | m["six"])
+    register_metric("batsmen", "boundaries", "boundary")
+
+Each grouping column is integer-coded once for all the tables grouped by
+it, every metric is one bincount over those codes, and each mask is
+computed once and shared by all the metrics and tables that use it.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+import partition_store
+from array_store import arrays_are_fresh, read_arrays
+from data_store import read_table
+
+
+MIN_BALLS = 50  # minimum balls faced/bowled for a player to be ranked
+
+
+def load_cleaned(folder: str = None, seasons=None, venues=None):
+    """Load the cleaned matches and deliveries tables.
+
+    Deliveries are memory-mapped from the array store when it is up to
+    date, so processes loading them share one copy of the data; otherwise
+    the columnar cache or the cleaned CSVs are read. Deliveries keep their
+    categorical columns; the small matches table is returned with plain
+    strings so value counts and groupbys behave as they do on the CSV.
+
+    `seasons` and `venues` (one value or a list) restrict both tables to the
+    matching matches. When a partitioned store matching the cleaned CSVs
+    exists only the partitions they select are read.
+
+    Returns: (matches_df, deliveries_df)
+    """
+    folder = folder or os.getcwd()
+    filtered = seasons is not None or venues is not None
+    store_root = os.path.join(folder, partition_store.STORE_NAME)
+    sources = [os.path.join(folder, "matches_cleaned.csv"), os.path.join(folder, "deliveries_cleaned.csv")]
+    if filtered and partition_store.is_fresh(store_root, sources):
+        matches, deliveries = partition_store.load_partitioned(store_root, seasons=seasons, venues=venues)
+        return matches, deliveries
+    matches = read_table(os.path.join(folder, "matches_cleaned.csv"), categorical=False)
+    deliveries_path = os.path.join(folder, "deliveries_cleaned.csv")
+    deliveries = read_arrays(deliveries_path) if arrays_are_fresh(deliveries_path) else read_table(deliveries_path)
+    if filtered:
+        if seasons is not None:
+            matches = matches[matches["season"].astype(str).isin([str(s) for s in _as_list(seasons)])]
+        if venues is not None:
+            matches = matches[matches["venue"].isin(_as_list(venues))]
+        matches = matches.reset_index(drop=True)
+        deliveries = deliveries[deliveries["match_id"].isin(matches["id"])].reset_index(drop=True)
+    return matches, deliveries
+
+
+def _encode(s: pd.Series):
+    """Integer-code a column; codes are shifted by one so missing values land in bucket 0."""
+    codes, uniques = pd.factorize(s, sort=True)
+    return codes + 1, pd.Index(list(uniques), name=s.name)
+
+
+# ==================== METRIC REGISTRY ====================
+# A metric is a column of a table: the sum of a per-ball array (or a count of
+# balls) per group of the table's grouping key. Per-ball arrays are named
+# "masks"; a mask is an expression over delivery columns and other masks, is
+# computed at most once per evaluation, and is shared by every metric using it.
+
+MASKS = {}      # mask name -> fn(m) -> per-ball array; m["name"] gives another mask or a delivery column
+GROUPINGS = {}  # table -> delivery column, or fn(deliveries, matches) -> (codes, names)
+METRICS = {}    # table -> {column: mask name, or None to count balls}
+DERIVED = {}    # table -> [fn(table) -> table], applied in order after the sums
+
+
+def register_mask(name: str, expression):
+    MASKS[name] = expression
+
+
+def register_table(table: str, grouping):
+    GROUPINGS[table] = grouping
+    METRICS.setdefault(table, {})
+    DERIVED.setdefault(table, [])
+
+
+def register_metric(table: str, column: str, mask: str = None):
+    """Add `column` to `table`: the per-group sum of `mask`, or the ball count when `mask` is None."""
+    METRICS[table][column] = mask
+
+
+def register_derived(table: str, fn):
+    """Add a step computing rates or filters from `table`'s summed columns."""
+    DERIVED[table].append(fn)
+
+
+class _Masks(dict):
+    """Lazily evaluated masks over one deliveries table."""
+
+    def __init__(self, deliveries: pd.DataFrame):
+        super().__init__()
+        self.deliveries = deliveries
+
+    def __missing__(self, name):
+        if name in MASKS:
+            value = MASKS[name](self)
+        else:
+            value = self.deliveries[name].to_numpy()
+        self[name] = value
+        return value
+
+
+def _ball_venues(deliveries: pd.DataFrame, matches: pd.DataFrame):
+    venue_codes, venues = _encode(matches["venue"])
+    ball_venues = pd.Series(venue_codes, index=matches["id"]).reindex(deliveries["match_id"]).fillna(0)
+    return ball_venues.to_numpy(dtype=np.int64), venues
+
+
+def _grouped_sums(codes: np.ndarray, n: int, columns: list) -> np.ndarray:
+    """Per-code sums of every column over one set of grouping codes.
+
+    `columns` holds per-ball arrays, None meaning a count of balls. One
+    bincount per column over the shared codes is faster than a single
+    bincount over a (balls x columns) matrix, which has to be built first.
+    Returns: (n, len(columns)) int64 array, the missing-value bucket dropped.
+    """
+    sums = np.empty((n, len(columns)), dtype=np.int64)
+    for j, column in enumerate(columns):
+        sums[:, j] = np.bincount(codes, weights=column, minlength=n + 1)[1:]
+    return sums
+
+
+def evaluate(deliveries: pd.DataFrame, matches: pd.DataFrame = None, tables=None) -> dict:
+    """Sum every registered metric of `tables` (default: all) in one pass per table.
+
+    Tables whose grouping needs `matches` are skipped when it is not given.
+    Returns: dict of table name -> DataFrame indexed by the grouping key
+    """
+    masks = _Masks(deliveries)
+    keys = {}
+    result = {}
+    for table in tables or GROUPINGS:
+        grouping = GROUPINGS[table]
+        if callable(grouping) and matches is None:
+            continue
+        # Tables grouped by the same column share its integer codes
+        key = grouping if isinstance(grouping, str) else table
+        if key not in keys:
+            keys[key] = _encode(deliveries[grouping]) if isinstance(grouping, str) else grouping(deliveries, matches)
+        codes, names = keys[key]
+        metrics = METRICS[table]
+        sums = _grouped_sums(codes, len(names), [None if m is None else masks[m] for m in metrics.values()])
+        stats = pd.DataFrame(sums, columns=list(metrics), index=names)
+        for fn in DERIVED[table]:
+            stats = fn(stats)
+        result[table] = stats
+    return result
+
+
+register_mask("wicket", lambda m: m["is_wicket"] == 1)
+register_mask("four", lambda m: m["batsman_runs"] == 4)
+register_mask("six", lambda m: m["batsman_runs"] == 6)
+register_mask("dot", lambda m: m["total_runs"] == 0)
+
+register_table("batsmen", "batter")
+register_metric("batsmen", "runs", "batsman_runs")
+register_metric("batsmen", "balls_faced")
+register_metric("batsmen", "fours", "four")
+register_metric("batsmen", "sixes", "six")
+register_derived("batsmen", lambda t: t.assign(strike_rate=(t["runs"] / t["balls_faced"] * 100).round(2)))
+
+register_table("bowlers", "bowler")
+register_metric("bowlers", "wickets", "wicket")
+register_metric("bowlers", "balls_bowled")
+register_metric("bowlers", "runs_conceded", "total_runs")
+register_metric("bowlers", "dot_balls", "dot")
+
+
+BOWLER_COLUMNS = ["wickets", "balls_bowled", "runs_conceded", "overs", "economy_rate", "dot_balls",
+                  "dot_ball_percentage"]
+
+
+def _bowler_rates(stats: pd.DataFrame) -> pd.DataFrame:
+    # Bowlers who never took a wicket are left out, as in the original reports
+    stats = stats[stats["wickets"] > 0].copy()
+    stats["overs"] = (stats["balls_bowled"] / 6).round(2)
+    stats["economy_rate"] = (stats["runs_conceded"] / (stats["balls_bowled"] / 6)).round(2)
+    stats["dot_ball_percentage"] = ((stats["dot_balls"] / stats["balls_bowled"]) * 100).round(2)
+    # Metrics registered later go after the standard columns
+    return stats[BOWLER_COLUMNS + [c for c in stats.columns if c not in BOWLER_COLUMNS]]
+
+
+register_derived("bowlers", _bowler_rates)
+
+register_table("team_batting", "batting_team")
+register_metric("team_batting", "runs", "total_runs")
+register_metric("team_batting", "balls")
+register_metric("team_batting", "wickets_lost", "wicket")
+register_derived("team_batting", lambda t: t.assign(run_rate=(t["runs"] / (t["balls"] / 6)).round(2)))
+
+register_table("venue_scoring", _ball_venues)
+register_metric("venue_scoring", "runs", "total_runs")
+register_metric("venue_scoring", "balls")
+register_derived("venue_scoring", lambda t: t.assign(run_rate=(t["runs"] / (t["balls"] / 6)).round(2)))
+
+
+def delivery_aggregates(deliveries: pd.DataFrame, matches: pd.DataFrame = None) -> dict:
+    """Build every ball-by-ball aggregate through the metric registry.
+
+    Returns a dict of DataFrames keyed by 'batsmen', 'bowlers', 'team_batting'
+    and, when `matches` is given, 'venue_scoring' (plus any registered tables).
+    """
+    return evaluate(deliveries, matches)
+
+
+def team_season_leaders(deliveries: pd.DataFrame, matches: pd.DataFrame, player: str, team: str, measure: str,
+                        top: int = 10) -> pd.DataFrame:
+    """The `top` players of every (season, team) by the sum of `measure`.
+
+    `measure` is a registered mask or a delivery column, e.g. leading
+    run scorers are ("batter", "batting_team", "batsman_runs") and wicket
+    takers ("bowler", "bowling_team", "wicket").
+    Returns: rows of season, team, player and measure, best first within each (season, team)
+    """
+    frame = pd.DataFrame({
+        "season": matches.set_index("id")["season"].astype(str).reindex(deliveries["match_id"]).to_numpy(),
+        "team": deliveries[team].to_numpy(),
+        "player": deliveries[player].to_numpy(),
+        measure: _Masks(deliveries)[measure],
+    })
+    totals = frame.groupby(["season", "team", "player"], sort=True, observed=True)[measure].sum().reset_index()
+    totals = totals.sort_values(["season", "team", measure], ascending=[True, True, False], kind="stable")
+    return totals.groupby(["season", "team"], sort=False).head(top).reset_index(drop=True)
+
+
+def team_wins(matches: pd.DataFrame) -> pd.Series:
+    """Total wins per franchise, most wins first."""
+    return matches[matches["winner"].notna()].groupby("winner", observed=True).size().sort_values(ascending=False)
+
+
+def venue_stats(matches: pd.DataFrame) -> pd.DataFrame:
+    """Matches played and decided at each venue."""
+    stats = matches[matches["winner"].notna()].groupby("venue", observed=True).agg({
+        "id": "count",
+        "winner": "count"
+    }).rename(columns={"id": "total_matches", "winner": "decided_matches"})
+    return stats.sort_values("total_matches", ascending=False)
+
+
+def season_stats(matches: pd.DataFrame) -> pd.DataFrame:
+    """Matches played and decided in each season."""
+    stats = matches.groupby("season", observed=True).agg({
+        "id": "count",
+        "winner": lambda x: x.notna().sum()
+    }).rename(columns={"id": "total_matches", "winner": "decided_matches"})
+    return stats.sort_index()
+
+
+def _as_list(value) -> list:
+    return [value] if isinstance(value, (str, int)) else list(value)
+
+
+def head_to_head(matches: pd.DataFrame, season=None, venue=None) -> pd.DataFrame:
+    """Head-to-head record for every pair of teams that have met.
+
+    Pairs are keyed alphabetically, so `team_a` < `team_b`. `season` and
+    `venue` accept a single value or a list to restrict the matches counted.
+
+    Returns a DataFrame with columns team_a, team_b, a_wins, b_wins,
+    no_result and total, most-played rivalries first.
+    """
+    if season is not None:
+        matches = matches[matches["season"].astype(str).isin([str(s) for s in _as_list(season)])]
+    if venue is not None:
+        matches = matches[matches["venue"].isin(_as_list(venue))]
+
+    team1 = matches["team1"].to_numpy(dtype=object)
+    team2 = matches["team2"].to_numpy(dtype=object)
+    winner = matches["winner"].to_numpy(dtype=object)
+    swap = team1 > team2
+    pairs = pd.DataFrame({
+        "team_a": np.where(swap, team2, team1),
+        "team_b": np.where(swap, team1, team2),
+    })
+    pairs["a_wins"] = winner == pairs["team_a"].to_numpy()
+    pairs["b_wins"] = winner == pairs["team_b"].to_numpy()
+    pairs["no_result"] = ~(pairs["a_wins"] | pairs["b_wins"])
+
+    h2h = pairs.groupby(["team_a", "team_b"]).agg(
+        a_wins=("a_wins", "sum"),
+        b_wins=("b_wins", "sum"),
+        no_result=("no_result", "sum"),
+        total=("a_wins", "size"),
+    ).astype("int64").reset_index()
+    return h2h.sort_values("total", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def toss_decision_stats(matches: pd.DataFrame) -> pd.DataFrame:
+    """How often the toss winner went on to win, split by toss decision."""
+    decided = matches[matches["winner"].notna() & matches["toss_decision"].notna()]
+    toss_won = decided["toss_winner"] == decided["winner"]
+    grouped = toss_won.groupby(decided["toss_decision"], sort=False, observed=True)
+    stats = pd.DataFrame({
+        "Wins_When_Toss_Won": grouped.sum(),
+        "Total_Matches": grouped.size(),
+    })
+    stats["Win_Percentage"] = (stats["Wins_When_Toss_Won"] / stats["Total_Matches"] * 100).round(2)
+    return stats.rename_axis("Decision").reset_index()
+
+
+def winning_factor_inputs(matches: pd.DataFrame) -> dict:
+    """Toss, toss-decision, venue and season inputs of the winning factors figure.
+
+    `decision_impact` is the toss winner's win % per decision (EDA.py's
+    "Toss Decision Impact"); keys match `charts.render_winning_factors`.
+    """
+    decided = matches[matches["winner"].notna()]
+    toss_won = (decided["toss_winner"] == decided["winner"]).rename(None)
+    grouped = toss_won.groupby(decided["toss_decision"])
+    return {
+        "toss_wins": toss_won.value_counts(),
+        "decision_impact": grouped.sum() / grouped.size() * 100,
+        "top_venues": matches["venue"].value_counts().head(12),
+        "season_data": matches["season"].value_counts().sort_index(),
+    }
+
+
+def qualified_batsmen(batsmen: pd.DataFrame, min_balls: int = MIN_BALLS) -> pd.DataFrame:
+    """Batters with at least `min_balls` balls faced, most runs first."""
+    return batsmen[batsmen["balls_faced"] >= min_balls].sort_values("runs", ascending=False)
+
+
+def qualified_bowlers(bowlers: pd.DataFrame, min_balls: int = MIN_BALLS) -> pd.DataFrame:
+    """Bowlers with at least `min_balls` balls bowled, most wickets first."""
+    return bowlers[bowlers["balls_bowled"] >= min_balls].sort_values("wickets", ascending=False)
+
+
+def compute_aggregates(deliveries: pd.DataFrame, matches: pd.DataFrame) -> dict:
+    """Compute every table used by the EDA and the CSV reports.
+
+    Returns a dict with the ball-by-ball tables from `delivery_aggregates`
+    plus 'rivalries', 'team_wins', 'venues', 'seasons' and 'toss_decisions'.
+    """
+    result = delivery_aggregates(deliveries, matches)
+    result["rivalries"] = head_to_head(matches)
+    result["team_wins"] = team_wins(matches)
+    result["venues"] = venue_stats(matches)
+    result["seasons"] = season_stats(matches)
+    result["toss_decisions"] = toss_decision_stats(matches)
+    return result
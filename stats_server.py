@@ -0,0 +1,221 @@
+"""Local HTTP service for the IPL report tables.
+
+Serves the batter, bowler, rivalry, venue, toss and season tables from
+`stats_engine` as JSON from one warm process:
+
+    python stats_server.py --port 8000
+    curl "http://127.0.0.1:8000/batters?season_from=2020&venue=Eden%20Gardens&min_balls=100&limit=10"
+
+Filters (all optional): `season_from`/`season_to` (season labels, compared
+as text so "2009" < "2009/10" < "2011"), `venue`, `min_balls` (batters and
+bowlers) and `limit`. Answers are kept in a bounded LRU cache keyed by the
+normalised query; the cache is dropped and the data reloaded whenever the
+cleaned files change on disk.
+"""
+import argparse
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import stats_engine
+from array_store import SCHEMA_NAME
+from stats_engine import MIN_BALLS, load_cleaned
+
+
+# The array store is rewritten as a whole, so its schema file changes with every rebuild
+DATA_FILES = ["matches_cleaned.csv", "matches_cleaned.parquet",
+              "deliveries_cleaned.csv", "deliveries_cleaned.parquet",
+              os.path.join("deliveries_cleaned.arrays", SCHEMA_NAME)]
+
+PARAMS = {"season_from": str, "season_to": str, "venue": str, "min_balls": int, "limit": int}
+
+
+def _records(df: pd.DataFrame) -> list:
+    df = df.reset_index() if df.index.name else df
+    return json.loads(df.to_json(orient="records"))
+
+
+def _batters(matches, deliveries, q):
+    stats = stats_engine.delivery_aggregates(deliveries)["batsmen"]
+    stats = stats[stats["balls_faced"] >= q.get("min_balls", MIN_BALLS)]
+    return stats.sort_values("runs", ascending=False)
+
+
+def _bowlers(matches, deliveries, q):
+    stats = stats_engine.delivery_aggregates(deliveries)["bowlers"]
+    stats = stats[stats["balls_bowled"] >= q.get("min_balls", MIN_BALLS)]
+    return stats.sort_values("wickets", ascending=False)
+
+
+def _rivalries(matches, deliveries, q):
+    return stats_engine.head_to_head(matches)
+
+
+def _venues(matches, deliveries, q):
+    return stats_engine.venue_stats(matches)
+
+
+def _toss(matches, deliveries, q):
+    return stats_engine.toss_decision_stats(matches)
+
+
+def _seasons(matches, deliveries, q):
+    return stats_engine.season_stats(matches)
+
+
+# endpoint -> (handler, needs deliveries)
+ENDPOINTS = {
+    "/batters": (_batters, True),
+    "/bowlers": (_bowlers, True),
+    "/rivalries": (_rivalries, False),
+    "/venues": (_venues, False),
+    "/toss": (_toss, False),
+    "/seasons": (_seasons, False),
+}
+
+
+def normalize_query(path: str, params: dict) -> tuple:
+    """Validate query parameters and return a hashable cache key.
+
+    Raises ValueError for unknown endpoints or parameters.
+    """
+    if path not in ENDPOINTS:
+        raise ValueError(f"unknown endpoint {path!r}; expected one of {sorted(ENDPOINTS)}")
+    query = {}
+    for name, value in params.items():
+        if name not in PARAMS:
+            raise ValueError(f"unknown parameter {name!r}")
+        query[name] = PARAMS[name](value.strip() if isinstance(value, str) else value)
+    return (path,) + tuple(sorted(query.items()))
+
+
+class StatsService:
+    """Loads the cleaned data once and answers queries through an LRU cache."""
+
+    def __init__(self, folder: str = None, cache_size: int = 256):
+        self.folder = folder or os.getcwd()
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._data = None
+        self.hits = self.misses = 0
+
+    def _data_version(self) -> tuple:
+        version = []
+        for name in DATA_FILES:
+            path = os.path.join(self.folder, name)
+            if os.path.exists(path):
+                st = os.stat(path)
+                version.append((name, st.st_mtime_ns, st.st_size))
+        return tuple(version)
+
+    def _refresh(self) -> tuple:
+        """Reload the data if the files changed; call with the lock held. Returns: (version, matches, deliveries)"""
+        version = self._data_version()
+        if version != self._version:
+            self._data = load_cleaned(self.folder)
+            self._cache.clear()
+            self._version = version
+        return (self._version, *self._data)
+
+    @staticmethod
+    def _filter(matches: pd.DataFrame, q: dict):
+        season = matches["season"].astype(str)
+        if "season_from" in q:
+            matches = matches[season >= q["season_from"]]
+        if "season_to" in q:
+            matches = matches[season.loc[matches.index] <= q["season_to"]]
+        if "venue" in q:
+            matches = matches[matches["venue"] == q["venue"]]
+        return matches
+
+    def query(self, path: str, params: dict):
+        """Return the JSON-ready rows for an endpoint and its filters."""
+        key = normalize_query(path, params)
+        # The lock only guards the cache and the reload; queries run concurrently on a snapshot of the tables
+        with self._lock:
+            version, all_matches, all_deliveries = self._refresh()
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            self.misses += 1
+
+        q = dict(key[1:])
+        handler, needs_deliveries = ENDPOINTS[path]
+        matches = self._filter(all_matches, q)
+        deliveries = None
+        if needs_deliveries:
+            deliveries = all_deliveries
+            if len(matches) != len(all_matches):
+                deliveries = deliveries[deliveries["match_id"].isin(matches["id"])]
+        table = handler(matches, deliveries, q)
+        if "limit" in q:
+            table = table.head(q["limit"])
+        result = _records(table)
+
+        with self._lock:
+            # An answer from data replaced while it was computed is returned but not cached
+            if version == self._version:
+                self._cache[key] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+
+def make_handler(service: StatsService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path not in ENDPOINTS:
+                self._send(404, {"error": f"unknown endpoint {url.path!r}", "endpoints": sorted(ENDPOINTS)})
+                return
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                self._send(200, service.query(url.path, params))
+            except ValueError as exc:
+                self._send(400, {"error": str(exc)})
+            except Exception as exc:
+                self._send(500, {"error": f"{type(exc).__name__}: {exc}"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(folder: str = None, host: str = "127.0.0.1", port: int = 8000, cache_size: int = 256):
+    """Run the stats service until interrupted."""
+    service = StatsService(folder, cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Serving IPL stats on http://{host}:{port} (endpoints: {', '.join(sorted(ENDPOINTS))})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local HTTP service for IPL stats")
+    parser.add_argument("--folder", default=None, help="folder with the cleaned data (default: current directory)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-size", type=int, default=256, help="maximum number of cached query results")
+    args = parser.parse_args()
+    serve(args.folder, args.host, args.port, args.cache_size)
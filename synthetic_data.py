@@ -0,0 +1,364 @@
+"""Seeded generator of synthetic IPL-style matches and ball-by-ball deliveries.
+
+Writes `matches.csv` and `deliveries.csv` in the same layout as the raw
+files, so the preprocessing script and every analysis can run on data of any
+size:
+
+    python synthetic_data.py --out-dir synthetic --seasons 40 --teams 16
+
+Each season is a double round robin (or `--matches-per-season` league
+fixtures) followed by the playoffs. Innings are simulated ball by ball:
+extras, runs and wickets are drawn from phase-dependent distributions
+(powerplay, middle and death overs) scaled by batter and bowler skill, strike
+rotates on odd runs and at the end of each over, and the chase stops once the
+target is reached. Squads carry over between seasons with some turnover.
+
+The same arguments and seed always give the same files. Rows are written a
+batch of matches at a time, so the output size is not limited by memory.
+"""
+import argparse
+import os
+from datetime import date, timedelta
+from itertools import permutations
+
+import numpy as np
+import pandas as pd
+
+
+MATCH_COLUMNS = ["id", "season", "city", "date", "match_type", "player_of_match", "venue", "team1", "team2",
+                 "toss_winner", "toss_decision", "winner", "result", "result_margin", "target_runs",
+                 "target_overs", "super_over", "method", "umpire1", "umpire2"]
+DELIVERY_COLUMNS = ["match_id", "inning", "batting_team", "bowling_team", "over", "ball", "batter", "bowler",
+                    "non_striker", "batsman_runs", "extra_runs", "total_runs", "extras_type", "is_wicket",
+                    "player_dismissed", "dismissal_kind", "fielder"]
+
+# (team, home venue, city); leagues with more teams get numbered franchises
+HOME_GROUNDS = [
+    ("Chennai Super Kings", "MA Chidambaram Stadium, Chepauk", "Chennai"),
+    ("Mumbai Indians", "Wankhede Stadium", "Mumbai"),
+    ("Royal Challengers Bengaluru", "M Chinnaswamy Stadium", "Bengaluru"),
+    ("Kolkata Knight Riders", "Eden Gardens", "Kolkata"),
+    ("Delhi Capitals", "Arun Jaitley Stadium", "Delhi"),
+    ("Punjab Kings", "Punjab Cricket Association IS Bindra Stadium", "Mohali"),
+    ("Rajasthan Royals", "Sawai Mansingh Stadium", "Jaipur"),
+    ("Sunrisers Hyderabad", "Rajiv Gandhi International Stadium", "Hyderabad"),
+    ("Gujarat Titans", "Narendra Modi Stadium", "Ahmedabad"),
+    ("Lucknow Super Giants", "Ekana Cricket Stadium", "Lucknow"),
+]
+
+INITIALS = list("ABCDGHJKMNPRSTVY")
+SURNAMES = ["Sharma", "Singh", "Patel", "Kumar", "Yadav", "Iyer", "Pandya", "Rahul", "Gill", "Jadeja",
+            "Chahar", "Thakur", "Rana", "Samson", "Kishan", "Pant", "Shaw", "Dube", "Tewatia", "Bishnoi",
+            "Smith", "Warner", "Maxwell", "Russell", "Narine", "Buttler", "Williamson", "Miller", "Rashid",
+            "Boult", "Cummins", "Starc", "Head", "Klaasen", "Pooran", "Hetmyer", "Conway", "Marsh", "Curran",
+            "Livingstone", "Salt", "Hazlewood", "Ferguson", "Mendis", "Hasaranga", "Theekshana", "Nabi"]
+UMPIRES = [f"{i} {s}" for i, s in zip("ABCDEFGHJKLMNPRS", ["Menon", "Gaffaney", "Reiffel", "Illingworth",
+           "Erasmus", "Tucker", "Dharmasena", "Shamshuddin", "Nandan", "Anil", "Chaudhary", "Pashkar",
+           "Rao", "Hariharan", "Shastri", "Duncan"])]
+
+# Batsman-run outcomes off the bat, per phase (powerplay, middle, death)
+RUNS = [0, 1, 2, 3, 4, 6]
+RUN_PROBS = [
+    [0.450, 0.300, 0.060, 0.005, 0.140, 0.045],
+    [0.350, 0.430, 0.090, 0.005, 0.090, 0.035],
+    [0.300, 0.360, 0.100, 0.005, 0.140, 0.095],
+]
+WICKET_PROBS = [0.042, 0.040, 0.075]
+EXTRAS = [("wides", 0.030), ("noballs", 0.004), ("legbyes", 0.015), ("byes", 0.005)]
+DISMISSALS = [("caught", 0.62), ("bowled", 0.17), ("lbw", 0.07), ("run out", 0.08), ("stumped", 0.03),
+              ("caught and bowled", 0.02), ("hit wicket", 0.01)]
+
+
+def _phase(over: int) -> int:
+    return 0 if over < 6 else (1 if over < 15 else 2)
+
+
+def _cumulative(probs) -> list:
+    return np.cumsum(probs).tolist()
+
+
+def _bat(u: float, probs: list, skill: float) -> int:
+    """Runs off the bat for uniform draw `u`; better batters turn dot balls into boundaries."""
+    four, six = probs[4] * skill, probs[5] * skill
+    dot = probs[0] - (four - probs[4]) - (six - probs[5])
+    edge = 0.0
+    for runs, p in zip(RUNS, (dot, probs[1], probs[2], probs[3], four)):
+        edge += p
+        if u < edge:
+            return runs
+    return 6
+
+
+class _League:
+    """Teams, squads and player skills, evolving season by season."""
+
+    def __init__(self, rng: np.random.Generator, teams: int, players_per_team: int):
+        self.rng = rng
+        self.grounds = HOME_GROUNDS[:teams] + [
+            (f"Franchise {k + 1}", f"Franchise {k + 1} Ground", f"City {k + 1}") for k in range(len(HOME_GROUNDS), teams)]
+        self.teams = [team for team, _, _ in self.grounds]
+        self.names = []
+        self.bat_skill = []
+        self.bowl_skill = []
+        self._used_names = set()
+        # Squads are ordered by batting position: openers first, specialist bowlers last
+        self.squads = {team: [self._new_player(i, players_per_team) for i in range(players_per_team)]
+                       for team in self.teams}
+
+    def _new_player(self, position: int, squad_size: int) -> int:
+        name = f"{self.rng.choice(INITIALS)} {self.rng.choice(SURNAMES)}"
+        suffix = 2
+        while name in self._used_names:
+            name = f"{name.rsplit(' (', 1)[0]} ({suffix})"
+            suffix += 1
+        self._used_names.add(name)
+        depth = position / max(squad_size - 1, 1)  # 0 = top order, 1 = tail
+        self.names.append(name)
+        self.bat_skill.append(float(np.clip(1.25 - 0.6 * depth + self.rng.normal(0, 0.1), 0.4, 1.6)))
+        self.bowl_skill.append(float(np.clip(0.8 + 0.4 * depth + self.rng.normal(0, 0.1), 0.5, 1.5)))
+        return len(self.names) - 1
+
+    def turnover(self, replaced: int):
+        """Replace `replaced` random squad members of every team with new players."""
+        for squad in self.squads.values():
+            for position in self.rng.choice(len(squad), size=min(replaced, len(squad)), replace=False):
+                squad[position] = self._new_player(int(position), len(squad))
+
+    def playing_xi(self, team: str) -> list:
+        """Eleven squad members in batting order; earlier squad members are picked more often."""
+        squad = self.squads[team]
+        weights = np.linspace(2.0, 1.0, len(squad))
+        picked = self.rng.choice(len(squad), size=min(11, len(squad)), replace=False, p=weights / weights.sum())
+        return [squad[i] for i in sorted(picked)]
+
+
+def _innings(rng, league: _League, match_id: int, inning: int, batting: str, bowling: str,
+             batters: list, fielders: list, rows: list, target: int = None, overs: int = 20):
+    """Simulate one innings, appending its deliveries to `rows`.
+
+    Returns: (runs, wickets, runs scored per batter)
+    """
+    names, bat_skill, bowl_skill = league.names, league.bat_skill, league.bowl_skill
+    bowlers = fielders[-5:]
+    rng.shuffle(bowlers)
+    extras_cdf = _cumulative([p for _, p in EXTRAS])
+    dismissal_cdf = _cumulative([p for _, p in DISMISSALS])
+
+    striker, non_striker, next_in = 0, 1, 2
+    runs = wickets = legal = 0
+    scores = {}
+    draws = rng.random((overs * 6 * 2, 5)).tolist()
+    d = 0
+    while legal < overs * 6 and wickets < len(batters) - 1 and (target is None or runs < target):
+        over = legal // 6
+        ball = 1
+        bowler = bowlers[over % len(bowlers)]
+        phase = _phase(over)
+        while True:
+            if d == len(draws):
+                draws += rng.random((overs * 6, 5)).tolist()
+            u_extra, u_runs, u_wicket, u_kind, u_fielder = draws[d]
+            d += 1
+
+            extras_type = None
+            for (kind, _), edge in zip(EXTRAS, extras_cdf):
+                if u_extra < edge:
+                    extras_type = kind
+                    break
+            batter = batters[striker]
+            skill = bat_skill[batter]
+            batsman_runs = extra_runs = 0
+            if extras_type in (None, "noballs"):
+                batsman_runs = _bat(u_runs, RUN_PROBS[phase], skill)
+                extra_runs = 1 if extras_type == "noballs" else 0
+            elif extras_type == "wides":
+                extra_runs = 5 if u_runs < 0.02 else 1
+            else:
+                extra_runs = 4 if u_runs < 0.12 else 1
+
+            is_wicket = 0
+            kind = fielder = None
+            if extras_type not in ("wides", "noballs"):
+                if u_wicket < WICKET_PROBS[phase] * bowl_skill[bowler] / skill:
+                    is_wicket = 1
+                    kind = next(k for (k, _), edge in zip(DISMISSALS, dismissal_cdf) if u_kind < edge)
+                    if kind in ("caught", "run out", "stumped"):
+                        fielder = fielders[int(u_fielder * len(fielders))]
+                    elif kind == "caught and bowled":
+                        fielder = bowler
+                    if kind == "run out":
+                        # Out going for a run: up to two completed before it
+                        completed = int(u_runs * 3)
+                        if extras_type is None:
+                            batsman_runs = completed
+                        else:
+                            extra_runs = completed
+                    else:
+                        # Any other dismissal ends the ball with nothing scored off it
+                        extras_type = None
+                        batsman_runs = extra_runs = 0
+
+            total = batsman_runs + extra_runs
+            runs += total
+            scores[batter] = scores.get(batter, 0) + batsman_runs
+            rows.append((match_id, inning, batting, bowling, over, ball, names[batter], names[bowler],
+                         names[batters[non_striker]], batsman_runs, extra_runs, total, extras_type, is_wicket,
+                         names[batter] if is_wicket else None, kind, names[fielder] if fielder is not None else None))
+            ball += 1
+
+            if is_wicket:
+                wickets += 1
+                striker = next_in
+                next_in += 1
+            # Runs completed between the wickets (a wide's first run is the penalty)
+            if (batsman_runs + (extra_runs - 1 if extras_type in ("wides", "noballs") else extra_runs)) % 2:
+                striker, non_striker = non_striker, striker
+            if extras_type not in ("wides", "noballs"):
+                legal += 1
+            if wickets == len(batters) - 1 or (target is not None and runs >= target):
+                break
+            if extras_type not in ("wides", "noballs") and legal % 6 == 0:
+                striker, non_striker = non_striker, striker
+                break
+    return runs, wickets, scores
+
+
+def _play(rng, league: _League, match_id: int, season: str, day: date, match_type: str,
+          home: str, away: str, deliveries: list) -> dict:
+    """Simulate one match; append its deliveries and return its matches row."""
+    _, venue, city = next(g for g in league.grounds if g[0] == home)
+    toss_winner = home if rng.random() < 0.5 else away
+    toss_decision = "field" if rng.random() < 0.64 else "bat"
+    other = away if toss_winner == home else home
+    first, second = (toss_winner, other) if toss_decision == "bat" else (other, toss_winner)
+    xi = {first: league.playing_xi(first), second: league.playing_xi(second)}
+
+    abandoned = rng.random() < 0.005
+    overs = int(rng.integers(1, 20)) if abandoned else 20
+    runs1, wickets1, scores1 = _innings(rng, league, match_id, 1, first, second, xi[first], xi[second],
+                                        deliveries, overs=overs)
+    umpires = rng.choice(len(UMPIRES), size=2, replace=False)
+    row = {
+        "id": match_id, "season": season, "city": city, "date": day.isoformat(), "match_type": match_type,
+        "venue": venue, "team1": first, "team2": second, "toss_winner": toss_winner,
+        "toss_decision": toss_decision, "method": None, "umpire1": UMPIRES[umpires[0]], "umpire2": UMPIRES[umpires[1]],
+        "super_over": "N",
+    }
+    if abandoned:
+        row.update(player_of_match=None, winner=None, result="no result", result_margin=None,
+                   target_runs=None, target_overs=None)
+        return row
+
+    target = runs1 + 1
+    runs2, wickets2, scores2 = _innings(rng, league, match_id, 2, second, first, xi[second], xi[first],
+                                        deliveries, target=target)
+    if runs2 >= target:
+        winner, result, margin, scores = second, "wickets", len(xi[second]) - 1 - wickets2, scores2
+    elif runs2 == runs1:
+        # Ties are settled by a super over, not simulated ball by ball
+        winner = first if rng.random() < 0.5 else second
+        result, margin, scores = "tie", None, scores1 if winner == first else scores2
+        row["super_over"] = "Y"
+    else:
+        winner, result, margin, scores = first, "runs", runs1 - runs2, scores1
+    row.update(player_of_match=league.names[max(scores, key=scores.get)], winner=winner, result=result,
+               result_margin=margin, target_runs=target, target_overs=20)
+    return row
+
+
+def _write(rows: list, columns: list, path: str, first: bool):
+    pd.DataFrame(rows, columns=columns).to_csv(path, mode="w" if first else "a", header=first,
+                                               index=False, na_rep="NA")
+
+
+def generate(out_dir: str, seasons: int = 17, teams: int = 10, players_per_team: int = 20,
+             matches_per_season: int = None, seed: int = 0, first_season: int = 2008,
+             first_match_id: int = 1_000_001, batch_matches: int = 200):
+    """Write synthetic `matches.csv` and `deliveries.csv` to `out_dir`.
+
+    Each season has `matches_per_season` league matches (default: every team
+    hosts every other team once) and, with four or more teams, the playoffs.
+    Rows are flushed every `batch_matches` matches.
+
+    Returns: (number of matches, number of deliveries)
+    """
+    if teams < 2:
+        raise ValueError("need at least two teams")
+    if players_per_team < 11:
+        raise ValueError("need at least 11 players per team")
+    os.makedirs(out_dir, exist_ok=True)
+    matches_path = os.path.join(out_dir, "matches.csv")
+    deliveries_path = os.path.join(out_dir, "deliveries.csv")
+
+    rng = np.random.default_rng(seed)
+    league = _League(rng, teams, players_per_team)
+    match_id = first_match_id
+    match_rows, delivery_rows = [], []
+    n_matches = n_deliveries = 0
+    first_write = True
+
+    def flush():
+        nonlocal match_rows, delivery_rows, first_write, n_deliveries
+        _write(match_rows, MATCH_COLUMNS, matches_path, first_write)
+        _write(delivery_rows, DELIVERY_COLUMNS, deliveries_path, first_write)
+        n_deliveries += len(delivery_rows)
+        match_rows, delivery_rows = [], []
+        first_write = False
+
+    def play(match_type, home, away):
+        nonlocal match_id, n_matches, day
+        row = _play(rng, league, match_id, season, day, match_type, home, away, delivery_rows)
+        match_rows.append(row)
+        match_id += 1
+        n_matches += 1
+        day += timedelta(days=1)
+        if len(match_rows) >= batch_matches:
+            flush()
+        return row
+
+    def knockout(match_type, home, away):
+        # An abandoned playoff goes to the higher-placed (home) team
+        winner = play(match_type, home, away)["winner"] or home
+        return winner, away if winner == home else home
+
+    for s in range(seasons):
+        if s:
+            league.turnover(max(1, players_per_team // 6))
+        season = str(first_season + s)
+        day = date(first_season + s, 3, 22)
+        fixtures = list(permutations(league.teams, 2))
+        rng.shuffle(fixtures)
+        if matches_per_season is not None:
+            fixtures = [fixtures[i % len(fixtures)] for i in range(matches_per_season)]
+
+        wins = dict.fromkeys(league.teams, 0)
+        for home, away in fixtures:
+            winner = play("League", home, away)["winner"]
+            if winner is not None:
+                wins[winner] += 1
+
+        if teams >= 4:
+            # Top four by league wins, ties broken by team order
+            table = sorted(league.teams, key=lambda t: -wins[t])
+            q1_winner, q1_loser = knockout("Qualifier 1", table[0], table[1])
+            eliminator_winner, _ = knockout("Eliminator", table[2], table[3])
+            q2_winner, _ = knockout("Qualifier 2", q1_loser, eliminator_winner)
+            knockout("Final", q1_winner, q2_winner)
+    flush()
+    return n_matches, n_deliveries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic IPL matches.csv and deliveries.csv")
+    parser.add_argument("--out-dir", default="synthetic_data", help="where the two CSVs are written")
+    parser.add_argument("--seasons", type=int, default=17)
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--players-per-team", type=int, default=20)
+    parser.add_argument("--matches-per-season", type=int, default=None,
+                        help="league matches per season (default: double round robin)")
+    parser.add_argument("--first-season", type=int, default=2008)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    n_matches, n_deliveries = generate(args.out_dir, args.seasons, args.teams, args.players_per_team,
+                                       args.matches_per_season, args.seed, args.first_season)
+    print(f"✓ Wrote {n_matches} matches and {n_deliveries} deliveries to {args.out_dir}")
@@ -0,0 +1,260 @@
+"""Win probability after every delivery.
+
+The state after each ball is rebuilt for all matches at once from running
+sums per innings: score, wickets in hand, legal balls left and, in the
+chase, runs required against `target_runs` over `target_overs`. Two
+logistic models, one per innings, score those states together with a
+venue baseline (the venue's chasing win rate and average first-innings
+score, shrunk towards the league figures for venues with few matches).
+
+Training is Newton's method on the full state matrix and scoring is one
+matrix product, so the curve of every historical match is a few array
+operations. `predict_ball` scores a single live state with plain float
+arithmetic, in microseconds:
+
+    model = WinProbabilityModel.fit(ball_states(deliveries, matches))
+    curves = model.predict(ball_states(deliveries, matches))
+    model.predict_ball(2, score=120, wickets=4, balls_left=30, target=165, venue="Wankhede Stadium")
+
+Every probability is that of the team batting second, so one match's
+values form a single curve across both innings.
+"""
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from stats_engine import load_cleaned
+
+
+MODEL_NAME = "win_probability_model.json"
+CURVES_NAME = "win_probability.csv"
+BALLS = 120
+VENUE_PRIOR = 10  # matches' worth of league average mixed into each venue's baseline
+RIDGE = 1e-3
+
+
+def _overs_to_balls(overs):
+    """Legal balls in an overs figure such as 20.0 or 15.4."""
+    whole = np.floor(overs)
+    return whole * 6 + np.round((overs - whole) * 10)
+
+
+def ball_states(deliveries: pd.DataFrame, matches: pd.DataFrame) -> pd.DataFrame:
+    """Match state after every delivery of the first two innings, in match order."""
+    deliveries = deliveries[deliveries["inning"].isin([1, 2])]
+    order = np.lexsort([deliveries[c].to_numpy() for c in ("ball", "over", "inning", "match_id")])
+    d = deliveries.iloc[order]
+    match = d["match_id"].to_numpy()
+    inning = d["inning"].to_numpy().astype(np.int64)
+    total = d["total_runs"].to_numpy().astype(np.int64)
+    wicket = (d["is_wicket"].to_numpy() == 1).astype(np.int64)
+    legal = (~d["extras_type"].isin(["wides", "noballs"])).to_numpy().astype(np.int64)
+
+    # Running sums per innings: global cumulative sums less their value before the innings' first ball
+    start = np.r_[True, (match[1:] != match[:-1]) | (inning[1:] != inning[:-1])] if len(d) else np.zeros(0, bool)
+    innings = np.cumsum(start) - 1
+    first = np.flatnonzero(start)
+
+    def running(values):
+        cum = np.cumsum(values)
+        return cum - (cum - values)[first][innings]
+
+    score, wickets, balls = running(total), running(wicket), running(legal)
+
+    context = matches.set_index("id").reindex(match)
+    target = context["target_runs"].to_numpy(dtype=float)
+    chase_balls = _overs_to_balls(context["target_overs"].to_numpy(dtype=float))
+    innings_balls = np.where(inning == 2, np.nan_to_num(chase_balls, nan=BALLS), BALLS)
+    states = pd.DataFrame({
+        "match_id": match,
+        "inning": inning,
+        "over": d["over"].to_numpy(),
+        "ball": d["ball"].to_numpy(),
+        "batting_team": d["batting_team"].to_numpy(),
+        "venue": context["venue"].to_numpy(),
+        "score": score,
+        "wickets": wickets,
+        "balls_left": np.maximum(innings_balls - balls, 0).astype(np.int64),
+        "runs_required": np.where(inning == 2, target - score, np.nan),
+    })
+    chasing_team = np.where(context["team1"].to_numpy() == d["batting_team"].to_numpy(),
+                            context["team2"].to_numpy(), context["team1"].to_numpy())
+    chasing_team = np.where(inning == 2, d["batting_team"].to_numpy(), chasing_team)
+    states["chase_won"] = (context["winner"].to_numpy() == chasing_team).astype(np.int64)
+    return states
+
+
+def _features(inning: int, score, wickets, balls_left, runs_required, chase_rate, par) -> list:
+    """Model inputs for one innings; plain arithmetic, so scalars and arrays both work."""
+    in_hand = 10 - wickets
+    if inning == 2:
+        required_rate = runs_required * 6 / (balls_left + 1)
+        return [1.0, required_rate, in_hand, balls_left / BALLS, required_rate * in_hand / 10, chase_rate - 0.5]
+    # First innings: runs ahead of the venue's par for this stage of the innings
+    ahead = (score - par * (BALLS - balls_left) / BALLS) / 20
+    return [1.0, ahead, in_hand, balls_left / BALLS, in_hand * balls_left / (10 * BALLS), chase_rate - 0.5]
+
+
+def _fit_logistic(x: np.ndarray, y: np.ndarray, iterations: int = 25) -> np.ndarray:
+    """Ridge-regularised logistic regression by Newton's method."""
+    coef = np.zeros(x.shape[1])
+    for _ in range(iterations):
+        p = 1 / (1 + np.exp(-(x @ coef)))
+        gradient = x.T @ (p - y) + RIDGE * coef
+        hessian = (x * (p * (1 - p))[:, None]).T @ x + RIDGE * np.eye(x.shape[1])
+        step = np.linalg.solve(hessian, gradient)
+        coef -= step
+        if np.abs(step).max() < 1e-8:
+            break
+    return coef
+
+
+class WinProbabilityModel:
+    """Per-innings logistic coefficients plus the venue baselines."""
+
+    def __init__(self, coef: dict, venues: dict, league: tuple):
+        self.coef = {int(k): tuple(v) for k, v in coef.items()}
+        self.venues = venues   # venue -> (chasing win rate, first-innings par)
+        self.league = tuple(league)
+
+    @staticmethod
+    def venue_baselines(states: pd.DataFrame) -> tuple:
+        """Shrunk chasing win rate and first-innings score per venue, and the league values."""
+        last = states.groupby(["match_id", "inning"], sort=False).tail(1)
+        first_innings = last[last["inning"] == 1].set_index("match_id")
+        per_match = pd.DataFrame({
+            "venue": first_innings["venue"],
+            "chase_won": first_innings["chase_won"],
+            "par": first_innings["score"],
+        })
+        league = (float(per_match["chase_won"].mean()), float(per_match["par"].mean()))
+        grouped = per_match.groupby("venue", observed=True)
+        n = grouped.size()
+        rate = (grouped["chase_won"].sum() + VENUE_PRIOR * league[0]) / (n + VENUE_PRIOR)
+        par = (grouped["par"].sum() + VENUE_PRIOR * league[1]) / (n + VENUE_PRIOR)
+        return {v: (float(r), float(p)) for v, r, p in zip(rate.index, rate, par)}, league
+
+    def _baselines(self, venue: pd.Series) -> tuple:
+        table = pd.DataFrame.from_dict(self.venues, orient="index", columns=["chase_rate", "par"])
+        looked_up = table.reindex(venue.to_numpy())
+        return (looked_up["chase_rate"].fillna(self.league[0]).to_numpy(),
+                looked_up["par"].fillna(self.league[1]).to_numpy())
+
+    @classmethod
+    def fit(cls, states: pd.DataFrame):
+        venues, league = cls.venue_baselines(states)
+        model = cls({}, venues, league)
+        chase_rate, par = model._baselines(states["venue"])
+        coef = {}
+        for inning in (1, 2):
+            rows = (states["inning"] == inning).to_numpy()
+            if inning == 2:
+                # Finished chases are decided; they carry no information for the model
+                rows = rows & (states["runs_required"] > 0).to_numpy() & (states["wickets"] < 10).to_numpy()
+            s = states[rows]
+            features = _features(inning, s["score"].to_numpy(), s["wickets"].to_numpy(), s["balls_left"].to_numpy(),
+                                 s["runs_required"].to_numpy(), chase_rate[rows], par[rows])
+            x = np.column_stack(np.broadcast_arrays(*features))
+            coef[inning] = _fit_logistic(x, s["chase_won"].to_numpy(dtype=float))
+        model.coef = {k: tuple(float(c) for c in v) for k, v in coef.items()}
+        return model
+
+    def predict(self, states: pd.DataFrame) -> pd.Series:
+        """Chasing team's win probability for every state, as one vectorized pass per innings."""
+        chase_rate, par = self._baselines(states["venue"])
+        prob = np.full(len(states), np.nan)
+        for inning in (1, 2):
+            rows = (states["inning"] == inning).to_numpy()
+            s = states[rows]
+            features = _features(inning, s["score"].to_numpy(), s["wickets"].to_numpy(), s["balls_left"].to_numpy(),
+                                 s["runs_required"].to_numpy(), chase_rate[rows], par[rows])
+            z = sum(c * f for c, f in zip(self.coef[inning], features))
+            prob[rows] = 1 / (1 + np.exp(-z))
+        # Decided chases: target reached, or out of wickets or balls short of it
+        required = states["runs_required"].to_numpy()
+        chase = states["inning"].to_numpy() == 2
+        lost = chase & (required > 0) & ((states["wickets"].to_numpy() >= 10) | (states["balls_left"].to_numpy() == 0))
+        prob = np.where(chase & (required <= 0), 1.0, np.where(lost, 0.0, prob))
+        return pd.Series(prob, index=states.index, name="chase_win_prob")
+
+    def predict_ball(self, inning: int, score: int, wickets: int, balls_left: int, target: int = None,
+                     venue: str = None) -> float:
+        """Chasing team's win probability for one live state; `target` is needed in the chase."""
+        chase_rate, par = self.venues.get(venue, self.league)
+        runs_required = target - score if inning == 2 else 0
+        if inning == 2:
+            if runs_required <= 0:
+                return 1.0
+            if wickets >= 10 or balls_left <= 0:
+                return 0.0
+        features = _features(inning, score, wickets, balls_left, runs_required, chase_rate, par)
+        z = sum(c * f for c, f in zip(self.coef[inning], features))
+        return 1 / (1 + math.exp(-z))
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"coef": self.coef, "venues": self.venues, "league": self.league}, f, indent=1)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            saved = json.load(f)
+        return cls(saved["coef"], {v: tuple(b) for v, b in saved["venues"].items()}, saved["league"])
+
+
+def win_probability_curves(folder: str = None, holdout_season=None) -> tuple:
+    """Fit on the cleaned data in `folder` and score every delivery.
+
+    With `holdout_season`, that season is left out of the fit and the
+    returned scores are for it alone, as an out-of-sample check.
+
+    Returns: (model, states with a `chase_win_prob` column)
+
+    Raises ValueError when no delivery belongs to `holdout_season`.
+    """
+    matches, deliveries = load_cleaned(folder or os.getcwd())
+    states = ball_states(deliveries, matches)
+    if holdout_season is not None:
+        season = matches.set_index("id")["season"].astype(str).reindex(states["match_id"]).to_numpy()
+        held_out = season == str(holdout_season)
+        if not held_out.any():
+            raise ValueError(f"no deliveries in season {holdout_season!r}")
+        model = WinProbabilityModel.fit(states[~held_out])
+        states = states[held_out]
+    else:
+        model = WinProbabilityModel.fit(states)
+    return model, states.assign(chase_win_prob=model.predict(states).round(4))
+
+
+def brier_score(states: pd.DataFrame) -> float:
+    return float(((states["chase_win_prob"] - states["chase_won"]) ** 2).mean())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Win-probability curves for every delivery")
+    parser.add_argument('--folder', default=None, help="folder with the cleaned data (default: current directory)")
+    parser.add_argument('--holdout-season', default=None, help="fit without this season and report its Brier score")
+    parser.add_argument('--match', type=int, default=None, help="print the curve of one match")
+    args = parser.parse_args()
+
+    folder = args.folder or os.getcwd()
+    if args.holdout_season is not None:
+        try:
+            _, held_out = win_probability_curves(folder, args.holdout_season)
+        except ValueError as exc:
+            parser.error(str(exc))
+        print(f"Season {args.holdout_season}: {held_out['match_id'].nunique()} matches, "
+              f"Brier score {brier_score(held_out):.4f} (coin flip: 0.25)")
+    else:
+        model, curves = win_probability_curves(folder)
+        model.save(os.path.join(folder, MODEL_NAME))
+        curves.drop(columns=["chase_won"]).to_csv(os.path.join(folder, CURVES_NAME), index=False)
+        print(f"✓ Saved: {MODEL_NAME}")
+        print(f"✓ Saved: {CURVES_NAME} ({len(curves)} deliveries, in-sample Brier score {brier_score(curves):.4f})")
+        if args.match is not None:
+            print(curves[curves["match_id"] == args.match][["inning", "over", "ball", "score", "wickets",
+                                                             "runs_required", "chase_win_prob"]].to_string(index=False))
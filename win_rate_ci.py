@@ -0,0 +1,167 @@
+"""Bootstrap confidence intervals and permutation tests for the winning factors.
+
+For every slice of the decided matches (all matches, each season, each
+venue with at least `MIN_MATCHES` games) this estimates:
+
+- `toss_win_rate`: % of matches won by the toss winner
+- `win_rate_<decision>`: the same, among matches where the toss winner chose
+  that decision (the `decision_impact` of EDA.py)
+- `<decision>_minus_<decision>`: the gap between the two decisions' rates
+
+Each estimate gets a percentile bootstrap interval. Rates are tested against
+a 50% toss effect by flipping each match's toss winner at random, and the
+decision gap by shuffling the decisions across the slice's matches.
+
+Resamples are drawn as NumPy index matrices in batches of about
+`BATCH_CELLS` values. The slices run serially unless workers are asked
+for, in which case they are spread over a process pool. Every slice has its
+own random stream spawned from `seed`, so results are the same whatever the
+number of workers:
+
+    python win_rate_ci.py --resamples 10000 --seed 0 --workers 4
+"""
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_store import read_table
+
+
+RESAMPLES = 10_000
+CONFIDENCE = 0.95
+MIN_MATCHES = 10
+BATCH_CELLS = 2_000_000
+
+
+def _rates(won: np.ndarray, decision: np.ndarray, n_decisions: int) -> np.ndarray:
+    """Toss win % and per-decision win % for each row of resampled outcomes.
+
+    Returns: array of shape (rows, 1 + n_decisions)
+    """
+    rates = [won.mean(axis=1)]
+    for d in range(n_decisions):
+        chose = decision == d
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates.append((won & chose).sum(axis=1) / chose.sum(axis=1))
+    return np.column_stack(rates) * 100
+
+
+def _resample_slice(job) -> tuple:
+    """Bootstrap and permutation statistics for one slice.
+
+    `job` is (won, decision codes, decision count, resamples, seed sequence).
+    Returns: (point estimates, bootstrap draws, permutation p-values), one column per metric
+    """
+    won, decision, n_decisions, resamples, seed = job
+    rng = np.random.default_rng(seed)
+    n = len(won)
+    gap = n_decisions == 2
+    estimate = _rates(won[None, :], decision[None, :], n_decisions)
+    if gap:
+        estimate = np.column_stack([estimate, estimate[:, 2] - estimate[:, 1]])
+
+    boot, null = [], []
+    batch = max(1, BATCH_CELLS // n)
+    for start in range(0, resamples, batch):
+        size = min(batch, resamples - start)
+        idx = rng.integers(0, n, size=(size, n))
+        rates = _rates(won[idx], decision[idx], n_decisions)
+
+        # Toss irrelevant: the toss winner is either team with equal odds
+        flipped = won ^ (rng.random((size, n)) < 0.5)
+        null_rates = np.abs(_rates(flipped, np.broadcast_to(decision, (size, n)), n_decisions) - 50)
+        if gap:
+            rates = np.column_stack([rates, rates[:, 2] - rates[:, 1]])
+            # Decision irrelevant: any match could have carried any of the slice's decisions
+            shuffled = rng.permuted(np.broadcast_to(decision, (size, n)), axis=1)
+            null_gap = _rates(np.broadcast_to(won, (size, n)), shuffled, n_decisions)
+            null_rates = np.column_stack([null_rates, np.abs(null_gap[:, 2] - null_gap[:, 1])])
+        boot.append(rates)
+        null.append(null_rates)
+
+    # Two-sided: how often the null lands at least as far from 50% (or from no gap) as observed
+    null = np.vstack(null)
+    observed = np.abs(estimate[0] - np.r_[[50.0] * (1 + n_decisions), [0.0] * gap])
+    with np.errstate(invalid="ignore"):
+        extreme = (null >= observed - 1e-9).sum(axis=0)
+    p_value = np.where(np.isfinite(observed), (extreme + 1) / (len(null) + 1), np.nan)
+    return estimate[0], np.vstack(boot), p_value
+
+
+def _slices(matches: pd.DataFrame, min_matches: int) -> list:
+    """(slice_by, slice, matches) for the whole history, each season and each venue with enough games."""
+    slices = [("all", "all", matches)]
+    for column in ("season", "venue"):
+        for value, group in matches.groupby(column, sort=True, observed=True):
+            if len(group) >= min_matches:
+                slices.append((column, value, group))
+    return slices
+
+
+def winning_factor_intervals(matches: pd.DataFrame, resamples: int = RESAMPLES, confidence: float = CONFIDENCE,
+                             seed: int = 0, min_matches: int = MIN_MATCHES, workers: int = 1) -> pd.DataFrame:
+    """Interval table for the toss and decision win rates, overall and by season and venue.
+
+    With `workers` > 1 the slices are spread over that many processes;
+    callers run from a script must then keep it behind an
+    `if __name__ == "__main__":` guard.
+
+    Returns: one row per (slice, metric) with the match count, estimate,
+    bootstrap interval and permutation p-value
+    """
+    decided = matches[matches["winner"].notna() & matches["toss_decision"].notna()]
+    decisions = sorted(decided["toss_decision"].unique())
+    metrics = ["toss_win_rate"] + [f"win_rate_{d}" for d in decisions]
+    if len(decisions) == 2:
+        metrics.append(f"{decisions[1]}_minus_{decisions[0]}")
+
+    slices = _slices(decided, min_matches)
+    seeds = np.random.SeedSequence(seed).spawn(len(slices))
+    jobs = [((s["toss_winner"] == s["winner"]).to_numpy(),
+             pd.Categorical(s["toss_decision"], categories=decisions).codes,
+             len(decisions), resamples, seq) for (_, _, s), seq in zip(slices, seeds)]
+
+    workers = min(workers or 1, len(jobs))
+    if workers <= 1:
+        results = [_resample_slice(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_resample_slice, jobs))
+
+    tail = (1 - confidence) / 2 * 100
+    rows = []
+    for (slice_by, value, group), (estimate, boot, p_value) in zip(slices, results):
+        with warnings.catch_warnings():
+            # A decision nobody chose in the slice has no draws at all
+            warnings.simplefilter("ignore", RuntimeWarning)
+            low, high = np.nanpercentile(boot, [tail, 100 - tail], axis=0)
+        for i, metric in enumerate(metrics):
+            rows.append({
+                "slice_by": slice_by, "slice": value, "metric": metric, "matches": len(group),
+                "estimate": estimate[i], "ci_low": low[i], "ci_high": high[i], "p_value": p_value[i],
+            })
+    table = pd.DataFrame(rows)
+    table[["estimate", "ci_low", "ci_high"]] = table[["estimate", "ci_low", "ci_high"]].round(2)
+    table["p_value"] = table["p_value"].round(4)
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bootstrap intervals for the toss and venue win rates")
+    parser.add_argument('--resamples', type=int, default=RESAMPLES, help="bootstrap and permutation draws per slice")
+    parser.add_argument('--confidence', type=float, default=CONFIDENCE, help="interval coverage (default 0.95)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed; the same seed gives the same table")
+    parser.add_argument('--min-matches', type=int, default=MIN_MATCHES, help="smallest season or venue reported")
+    parser.add_argument('--workers', type=int, default=1, help="processes used for the resampling (default: 1)")
+    parser.add_argument('--output', default='winning_factors_ci.csv', help="where the table is written")
+    args = parser.parse_args()
+
+    matches = read_table('matches_cleaned.csv', categorical=False)
+    table = winning_factor_intervals(matches, args.resamples, args.confidence, args.seed,
+                                     args.min_matches, args.workers)
+    table.to_csv(args.output, index=False)
+    print(table[table["slice_by"] == "all"].to_string(index=False))
+    print(f"\n✓ Saved: {args.output}")